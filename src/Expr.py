@@ -28,6 +28,21 @@ class ExprVisitor(ABC):
         # Method to visit a grouping expression (parentheses)
         pass
 
+    @abstractmethod
+    def visit_index_expr(self, expr):
+        # Method to visit an index expression (list element access)
+        pass
+
+    @abstractmethod
+    def visit_indexset_expr(self, expr):
+        # Method to visit an index set expression (assignment to a list element)
+        pass
+
+    @abstractmethod
+    def visit_list_expr(self, expr):
+        # Method to visit a list literal
+        pass
+
     @abstractmethod
     def visit_literal_expr(self, expr):
         # Method to visit a literal expression (e.g., numbers, strings)
@@ -66,6 +81,8 @@ class ExprVisitor(ABC):
 
 # Abstract base class for expressions
 class Expr:
+    __slots__ = ()
+
     @abstractmethod
     def __init__(self):
         pass
@@ -73,10 +90,15 @@ class Expr:
 
 # Assignment expression
 class Assign(Expr):
+    __slots__ = ('name', 'value', 'depth', 'slot')
+
     def __init__(self, name, value):
         # Initialize with variable name and assigned value
         self.name = name
         self.value = value
+        # Scope distance and slot set by the resolver; depth stays None for globals
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor):
         # Accept a visitor
@@ -85,6 +107,8 @@ class Assign(Expr):
 
 # Binary expression
 class Binary(Expr):
+    __slots__ = ('left', 'operator', 'right')
+
     def __init__(self, left, operator, right):
         # Initialize with left operand, operator, and right operand
         self.left = left
@@ -98,6 +122,8 @@ class Binary(Expr):
 
 # Call expression (function calls)
 class Call(Expr):
+    __slots__ = ('callee', 'paren', 'arguments')
+
     def __init__(self, callee, paren, arguments):
         # Initialize with callee, parenthesis token, and arguments
         self.callee = callee
@@ -111,10 +137,15 @@ class Call(Expr):
 
 # Get expression (property access)
 class Get(Expr):
+    __slots__ = ('object', 'name', 'cached')
+
     def __init__(self, object, name):
         # Initialize with object and property name
         self.object = object
         self.name = name
+        # Inline method cache: a (class, method) pair of the receiver class last seen at this site and
+        # the method it resolved to, replaced as a whole so readers never see a mixed pair
+        self.cached = (None, None)
 
     def accept(self, visitor):
         # Accept a visitor
@@ -123,6 +154,8 @@ class Get(Expr):
 
 # Grouping expression (parentheses)
 class Grouping(Expr):
+    __slots__ = ('expr',)
+
     def __init__(self, expr):
         # Initialize with inner expression
         self.expr = expr
@@ -132,8 +165,55 @@ class Grouping(Expr):
         return visitor.visit_grouping_expr(self)
 
 
+# Index expression (list element access)
+class Index(Expr):
+    __slots__ = ('object', 'bracket', 'index')
+
+    def __init__(self, object, bracket, index):
+        # Initialize with the indexed object, opening bracket token, and index
+        self.object = object
+        self.bracket = bracket
+        self.index = index
+
+    def accept(self, visitor):
+        # Accept a visitor
+        return visitor.visit_index_expr(self)
+
+
+# Index set expression (assignment to a list element)
+class IndexSet(Expr):
+    __slots__ = ('object', 'bracket', 'index', 'value')
+
+    def __init__(self, object, bracket, index, value):
+        # Initialize with the indexed object, opening bracket token, index, and value
+        self.object = object
+        self.bracket = bracket
+        self.index = index
+        self.value = value
+
+    def accept(self, visitor):
+        # Accept a visitor
+        return visitor.visit_indexset_expr(self)
+
+
+# List literal expression
+class List(Expr):
+    __slots__ = ('bracket', 'elements')
+
+    def __init__(self, bracket, elements):
+        # Initialize with opening bracket token and element expressions
+        self.bracket = bracket
+        self.elements = elements
+
+    def accept(self, visitor):
+        # Accept a visitor
+        return visitor.visit_list_expr(self)
+
+
 # Literal expression (numbers, strings, booleans, etc.)
 class Literal(Expr):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         # Initialize with value
         self.value = value
@@ -145,6 +225,8 @@ class Literal(Expr):
 
 # Logical expression (AND, OR)
 class Logical(Expr):
+    __slots__ = ('left', 'operator', 'right')
+
     def __init__(self, left, operator, right):
         # Initialize with left operand, operator, and right operand
         self.left = left
@@ -158,6 +240,8 @@ class Logical(Expr):
 
 # Set expression (assignment to a property)
 class Set(Expr):
+    __slots__ = ('object', 'name', 'value')
+
     def __init__(self, object, name, value):
         # Initialize with object, property name, and value
         self.object = object
@@ -171,10 +255,15 @@ class Set(Expr):
 
 # Super expression (accessing superclass methods)
 class Super(Expr):
+    __slots__ = ('keyword', 'method', 'depth', 'slot')
+
     def __init__(self, keyword, method):
         # Initialize with keyword (super) and method name
         self.keyword = keyword
         self.method = method
+        # Scope distance and slot of 'super' set by the resolver
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor):
         # Accept a visitor
@@ -183,9 +272,14 @@ class Super(Expr):
 
 # This expression (current instance)
 class This(Expr):
+    __slots__ = ('keyword', 'depth', 'slot')
+
     def __init__(self, keyword):
         # Initialize with keyword (this)
         self.keyword = keyword
+        # Scope distance and slot of 'this' set by the resolver
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor):
         # Accept a visitor
@@ -194,6 +288,8 @@ class This(Expr):
 
 # Unary expression (negation, logical NOT)
 class Unary(Expr):
+    __slots__ = ('operator', 'right')
+
     def __init__(self, operator, right):
         # Initialize with operator and operand
         self.operator = operator
@@ -206,9 +302,14 @@ class Unary(Expr):
 
 # Variable expression
 class Variable(Expr):
+    __slots__ = ('name', 'depth', 'slot')
+
     def __init__(self, name):
         # Initialize with variable name
         self.name = name
+        # Scope distance and slot set by the resolver; depth stays None for globals
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor):
         # Accept a visitor
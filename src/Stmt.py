@@ -56,6 +56,8 @@ class StmtVisitor(ABC):
 
 # Abstract base class for statements
 class Stmt:
+    __slots__ = ()
+
     @abstractmethod
     def __init__(self):
         pass
@@ -63,6 +65,8 @@ class Stmt:
 
 # Block statement (a list of statements)
 class Block(Stmt):
+    __slots__ = ('stmts',)
+
     def __init__(self, stmts):
         # Initialize with a list of statements
         self.stmts = stmts
@@ -74,6 +78,8 @@ class Block(Stmt):
 
 # Class statement (class declaration)
 class Class(Stmt):
+    __slots__ = ('name', 'super_class', 'methods')
+
     def __init__(self, name, super_class, methods):
         # Initialize with class name, superclass, and methods
         self.name = name
@@ -87,6 +93,8 @@ class Class(Stmt):
 
 # Expression statement
 class Expression(Stmt):
+    __slots__ = ('expr',)
+
     def __init__(self, expr):
         # Initialize with an expression
         self.expr = expr
@@ -98,6 +106,8 @@ class Expression(Stmt):
 
 # Function statement (function declaration)
 class Function(Stmt):
+    __slots__ = ('name', 'params', 'body')
+
     def __init__(self, name, params, body):
         # Initialize with function name, parameters, and body
         self.name = name
@@ -111,6 +121,8 @@ class Function(Stmt):
 
 # If statement
 class If(Stmt):
+    __slots__ = ('condition', 'then_branch', 'else_branch')
+
     def __init__(self, condition, then_branch, else_branch):
         # Initialize with condition, then-branch, and else-branch
         self.condition = condition
@@ -124,6 +136,8 @@ class If(Stmt):
 
 # Print statement
 class Print(Stmt):
+    __slots__ = ('expr',)
+
     def __init__(self, expr):
         # Initialize with an expression to print
         self.expr = expr
@@ -135,6 +149,8 @@ class Print(Stmt):
 
 # Return statement
 class Return(Stmt):
+    __slots__ = ('keyword', 'value')
+
     def __init__(self, keyword, value):
         # Initialize with return keyword and return value
         self.keyword = keyword
@@ -147,6 +163,8 @@ class Return(Stmt):
 
 # Variable declaration statement
 class Var(Stmt):
+    __slots__ = ('name', 'initializer')
+
     def __init__(self, name, initializer):
         # Initialize with variable name and initializer expression
         self.name = name
@@ -159,6 +177,8 @@ class Var(Stmt):
 
 # While statement
 class While(Stmt):
+    __slots__ = ('condition', 'body')
+
     def __init__(self, condition, body):
         # Initialize with condition and body statements
         self.condition = condition
@@ -171,6 +191,8 @@ class While(Stmt):
 
 # Input statement (custom statement for reading input)
 class Input(Stmt):
+    __slots__ = ('name', 'expression')
+
     def __init__(self, name, expression):
         # Initialize with variable name and input prompt expression
         self.name = name
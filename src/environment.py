@@ -1,12 +1,20 @@
 class Environment:
+    __slots__ = ('values', 'slots', 'enclosing')
+
     def __init__(self, environment=None):
-        # Initialize the environment with an optional enclosing environment
-        self.values = {}
+        # Initialize the environment with an optional enclosing environment.
+        # The global environment stores variables by name; local environments store them in
+        # slots, in the order the resolver numbered their declarations
+        self.values = {} if environment is None else None
+        self.slots = []
         self.enclosing = environment
 
     def define(self, name, object):
         # Define a new variable in the environment
-        self.values[name] = object
+        if self.values is None:
+            self.slots.append(object)
+        else:
+            self.values[name] = object
 
     def ancestor(self, distance):
         # Find the ancestor environment at a given distance
@@ -15,14 +23,13 @@ class Environment:
             environment = environment.enclosing
         return environment
 
-    def get_at(self, distance, name):
-        # Get the value of a variable at a specific distance in the environment chain
-        value = self.ancestor(distance).values.get(name)
-        return value
+    def get_at(self, distance, slot):
+        # Get the value of a local variable by its resolved distance and slot index
+        return self.ancestor(distance).slots[slot]
 
-    def assign_at(self, distance, name, value):
-        # Assign a value to a variable at a specific distance in the environment chain
-        self.ancestor(distance).values.update({name.lexeme: value})
+    def assign_at(self, distance, slot, value):
+        # Assign a value to a local variable by its resolved distance and slot index
+        self.ancestor(distance).slots[slot] = value
 
     def get(self, name):
         # Get the value of a variable in the current or enclosing environments
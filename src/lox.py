@@ -1,20 +1,170 @@
 import sys
 import os
-from scanner import Scanner
+import argparse
+from scanner import RegexScanner
 from lox_parser import Parser
 from lox_interpreter import Interpreter
 from token_type import TokenType
 from lox_resolver import Resolver
+from lox_compiler import Compiler
+from lox_vm import VM
+from lox_cache import AstCache
+from lox_optimizer import Optimizer
+from lox_profiler import Profiler
+from lox_stats import ExecutionStats
+
+# Exit codes of the command line interface, following the BSD sysexits convention
+EXIT_USAGE = 64  # Bad command line
+EXIT_DATA_ERROR = 65  # Scan, parse or resolve error in a script
+EXIT_NO_INPUT = 66  # Script could not be read
+EXIT_SOFTWARE = 70  # Runtime error while executing a script
+EXIT_INTERRUPTED = 130  # Stopped with Ctrl-C
 
 
 class Lox:
-    def __init__(self):
-        # Initialize the Lox interpreter with command line arguments and an interpreter instance
+    def __init__(self, optimize=True, output=None):
+        # Initialize the Lox interpreter with command line arguments and an interpreter instance.
+        # Unless optimize is False, resolved statements go through the constant folding pass, whose
+        # totals are available from self.optimizer.report(). Printed output goes to the output text
+        # stream, sys.stdout by default
         self.args = sys.argv
-        self.interpreter = Interpreter()
+        self.interpreter = Interpreter(output)
+        self.vm = VM(self.interpreter)
+        self.optimizer = Optimizer() if optimize else None
+        self.cache = AstCache(optimize)
+
+    def main(self, argv=None):
+        # Command line entry point: run scripts, directories of scripts, standard input or -e sources
+        # without prompting and return the exit status. A first argument of 'bench' runs the
+        # benchmark suite instead; with no scripts and an interactive terminal the REPL starts
+        argv = self.args[1:] if argv is None else argv
+        if argv[:1] == ["bench"]:
+            from lox_bench import BenchmarkRunner
+            return BenchmarkRunner().main(argv[1:])
+        parser = argparse.ArgumentParser(prog="lox", description="Run Lox scripts.")
+        parser.add_argument("scripts", nargs="*",
+                            help="script files or directories of .lox scripts to run in order; '-' reads standard input")
+        parser.add_argument("-e", dest="sources", action="append", default=[], metavar="SOURCE",
+                            help="run SOURCE as a program before any scripts (may be repeated)")
+        engine = parser.add_mutually_exclusive_group()
+        engine.add_argument("--vm", action="store_true", help="run on the bytecode virtual machine")
+        engine.add_argument("--closures", action="store_true", help="run on the closure compiler")
+        parser.add_argument("--no-optimize", action="store_true", help="skip the constant folding pass")
+        parser.add_argument("--no-cache", action="store_true", help="do not read or write __loxcache__ entries")
+        parser.add_argument("--stages", action="store_true", help="show the interactive menu of stage tests")
+        parser.add_argument("-j", "--jobs", type=int, default=1, metavar="N",
+                            help="run scripts on N worker processes, printing their output in order")
+        parser.add_argument("--timeout", type=float, metavar="SECONDS",
+                            help="stop any script running longer than SECONDS (runs on worker processes)")
+        parser.add_argument("--profile", action="store_true",
+                            help="print time per function (tree-walker and --closures) and per source line "
+                                 "(tree-walker only) to stderr")
+        parser.add_argument("--profile-stacks", metavar="FILE",
+                            help="write sampled call stacks in collapsed format for flame graphs to FILE")
+        parser.add_argument("--timing", action="store_true",
+                            help="in the interactive prompt, print the compile and run time of each input to stderr")
+        parser.add_argument("--stats", action="store_true",
+                            help="print counts of evaluated nodes, environments, calls, binds, instances and returns "
+                                 "to stderr (tree-walker and --closures, not --vm)")
+        try:
+            args = parser.parse_intermixed_args(argv)
+        except SystemExit as exit:
+            return EXIT_USAGE if exit.code else 0
+        if args.no_optimize:
+            self.optimizer = None
+            self.cache = AstCache(False)
+        if args.stages:
+            self.stage_menu()
+            return 0
+        batch = args.jobs > 1 or args.timeout is not None
+        if batch and (args.profile or args.profile_stacks or args.stats):
+            print("lox: error: profiling and stats are not available with --jobs or --timeout", file=sys.stderr)
+            return EXIT_USAGE
+        if args.vm and args.stats:
+            # The VM keeps no counters, so its report would be all zeros
+            print("lox: error: stats are not available with --vm", file=sys.stderr)
+            return EXIT_USAGE
+        if args.profile or args.profile_stacks:
+            self.interpreter.profiler = Profiler()
+        if args.stats:
+            self.interpreter.stats = ExecutionStats()
+
+        # Each job is a (name, kind, payload) tuple: kind "source" carries the program text and
+        # kind "file" the path to read it from
+        jobs = [("<string>", "source", source) for source in args.sources]
+        for script in args.scripts:
+            if script == "-":
+                jobs.append(("<stdin>", "source", sys.stdin.read()))
+            elif os.path.isdir(script):
+                # Every .lox file directly inside the directory, in name order
+                for file_name in sorted(os.listdir(script)):
+                    path = os.path.join(script, file_name)
+                    if file_name.endswith(".lox") and os.path.isfile(path):
+                        jobs.append((path, "file", path))
+            else:
+                jobs.append((script, "file", script))
+        if not jobs:
+            if sys.stdin.isatty():
+                self.run_prompt(args.vm, args.closures, args.timing)
+                return 0
+            jobs.append(("<stdin>", "source", sys.stdin.read()))
+
+        options = {"use_vm": args.vm, "compile_closures": args.closures, "use_cache": not args.no_cache}
+        status = 0
+        try:
+            if batch:
+                from lox_batch import BatchRunner
+                runner = BatchRunner(args.jobs, args.timeout, self.optimizer is not None, **options)
+                for result in runner.run(jobs):
+                    sys.stdout.write(result.stdout)
+                    sys.stdout.flush()
+                    sys.stderr.write(result.stderr)
+                    status = status or result.status
+            else:
+                for job in jobs:
+                    code = self.run_script(job, **options)
+                    status = status or code
+        except KeyboardInterrupt:
+            return EXIT_INTERRUPTED
+        profiler = self.interpreter.profiler
+        if profiler is not None:
+            if args.profile:
+                print(profiler.report(), file=sys.stderr)
+            if args.profile_stacks:
+                with open(args.profile_stacks, "w") as f:
+                    profiler.write_collapsed(f)
+        if self.interpreter.stats is not None:
+            print(self.interpreter.stats.report(), file=sys.stderr)
+        return status
+
+    def run_script(self, job, use_vm=False, compile_closures=False, use_cache=True):
+        # Run one (name, kind, payload) job of a batch in fresh globals, reusing this instance's already
+        # initialized interpreter, and return its exit status; errors go to stderr with the script name
+        name, kind, payload = job
+        self.interpreter.reset_globals()
+        try:
+            if kind == "file":
+                statements = self.load_file(payload, use_cache)
+            else:
+                statements = self.load_source(payload)
+        except OSError as error:
+            return self.report_failure(name, error.strerror or str(error), EXIT_NO_INPUT)
+        except (ValueError, RuntimeError) as error:
+            return self.report_failure(name, error, EXIT_DATA_ERROR)
+        try:
+            self.execute(statements, use_vm, compile_closures)
+        except RuntimeError as error:
+            return self.report_failure(name, error, EXIT_SOFTWARE)
+        return 0
 
-    def main(self):
-        # Main method to start the interactive prompt for the Lox interpreter
+    def report_failure(self, name, error, status):
+        # Print a script's error after any output it produced and return the given exit status
+        sys.stdout.flush()
+        print(f"{name}: {error}", file=sys.stderr)
+        return status
+
+    def stage_menu(self):
+        # Interactive menu for running the stage tests in ../tests
         current_dir = os.getcwd()
         print(current_dir)
 
@@ -50,26 +200,73 @@ class Lox:
             # Run the selected stage file
             self.run_file(file_name)
 
-    def run_file(self, path):
+    def run_file(self, path, use_vm=False, compile_closures=False, use_cache=True):
         # Method to run the Lox code from a file
-        with open(path, 'r') as f:
-            self.run(f.read())
+        self.execute(self.load_file(path, use_cache), use_vm, compile_closures)
 
-    def run_prompt(self):
-        # Interactive prompt for running Lox code line by line
-        while True:
-            prompt = input("py-lox> ")
-            self.run(prompt)
-
-    def run(self, source):
-        # Core method to run the Lox code
-        scanner = Scanner(source)  # Tokenize the source code
-        tokens = scanner.scan_tokens()  # Get the list of tokens
-        parser = Parser(tokens)  # Create a parser with the tokens
-        statements = parser.parse()  # Parse the tokens into statements
-        resolver = Resolver(self.interpreter)  # Create a resolver for variable resolution
+    def load_file(self, path, use_cache=True):
+        # Return the resolved statements of a file. With use_cache they are loaded from the file's
+        # __loxcache__ entry when its source is unchanged, and stored there otherwise; without it the
+        # file is scanned incrementally while it is parsed
+        if use_cache:
+            with open(path, 'r') as f:
+                source = f.read()
+            statements = self.cache.load(path, source)
+            if statements is None:
+                statements = self.optimize(self.resolve(self.parse(self.scan(source))))
+                self.cache.store(path, source, statements)
+        else:
+            with open(path, 'r') as f:
+                statements = self.parse(RegexScanner(f).iter_tokens())
+            statements = self.optimize(self.resolve(statements))
+        return statements
+
+    def run_prompt(self, use_vm=False, compile_closures=False, timing=False):
+        # Interactive prompt for running Lox code; an input may span several lines, errors are reported
+        # and the prompt continues until end of input. With timing set, the compile and run time of
+        # every input is printed to stderr
+        from lox_repl import ReplSession
+        ReplSession(self, use_vm, compile_closures, timing).run()
+
+    def run(self, source, use_vm=False, compile_closures=False):
+        # Core method to run the Lox code, on the bytecode VM when use_vm is set. Each phase is a
+        # separate method so tools such as the benchmark runner can time them individually
+        self.execute(self.load_source(source), use_vm, compile_closures)
+
+    def load_source(self, source):
+        # Return the resolved (and optimized) statements of source code
+        tokens = self.scan(source)
+        statements = self.parse(tokens)
+        statements = self.resolve(statements)
+        return self.optimize(statements)
+
+    def scan(self, source):
+        # Tokenize the source code into a list of tokens
+        return RegexScanner(source).scan_tokens()
+
+    def parse(self, tokens):
+        # Parse tokens into a list of statements
+        return Parser(tokens).parse()
+
+    def resolve(self, statements):
+        # Resolve variable scopes, annotating the statements in place
+        resolver = Resolver()  # Create a resolver for variable resolution
         resolver.resolve_stmts(statements)  # Resolve variable scopes
-        self.interpreter.interpret(statements)  # Interpret and execute the statements
+        return statements
+
+    def optimize(self, statements):
+        # Fold constants and drop dead branches unless the optimizer is disabled
+        if self.optimizer is None:
+            return statements
+        return self.optimizer.optimize(statements)
+
+    def execute(self, statements, use_vm=False, compile_closures=False):
+        # Execute resolved statements, on the bytecode VM when use_vm is set
+        if use_vm:
+            function = Compiler().compile(statements)  # Compile the statements to bytecode
+            self.vm.interpret(function)  # Execute the bytecode on the stack VM
+        else:
+            self.interpreter.interpret(statements, compile_closures)  # Interpret and execute the statements
 
     def parse_error(self, token, message):
         # Handle parse errors
@@ -93,5 +290,4 @@ class Lox:
 
 if __name__ == "__main__":
     # Entry point of the program
-    s = Lox()
-    s.main()
+    sys.exit(Lox().main())
@@ -0,0 +1,93 @@
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from itertools import repeat
+
+from lox import Lox, EXIT_SOFTWARE
+
+EXIT_TIMEOUT = 124  # Script stopped by the per-script timeout, as with timeout(1)
+
+# Lox instance of the current worker process, created once by init_worker and reused for every script
+worker_lox = None
+
+
+# Raised inside a worker when a script exceeds its time limit
+class ScriptTimeout(Exception):
+    pass
+
+
+# Outcome of one script of a batch: its exit status, captured output and run time in seconds
+class BatchResult:
+    __slots__ = ('name', 'status', 'stdout', 'stderr', 'elapsed')
+
+    def __init__(self, name, status, stdout, stderr, elapsed):
+        # Initialize the result of the named script
+        self.name = name
+        self.status = status
+        self.stdout = stdout
+        self.stderr = stderr
+        self.elapsed = elapsed
+
+
+def init_worker(optimize):
+    # Create the worker's Lox instance, so interpreter setup is paid once per process
+    global worker_lox
+    worker_lox = Lox(optimize)
+
+
+def raise_timeout(signum, frame):
+    # SIGALRM handler interrupting the running script
+    raise ScriptTimeout()
+
+
+def run_job(job, options, timeout):
+    # Run one (name, kind, payload) job on the worker's Lox instance with its output captured. The
+    # timeout is enforced with an interval timer where available (Unix); scripts that need standard
+    # input fail, since workers have none
+    stdout = StringIO()
+    stderr = StringIO()
+    use_timer = timeout is not None and hasattr(signal, "setitimer")
+    start = time.perf_counter()
+    try:
+        if use_timer:
+            signal.signal(signal.SIGALRM, raise_timeout)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            status = worker_lox.run_script(job, **options)
+    except ScriptTimeout:
+        status = EXIT_TIMEOUT
+        stderr.write(f"{job[0]}: Timed out after {timeout:g} seconds.\n")
+    except Exception as error:
+        status = EXIT_SOFTWARE
+        stderr.write(f"{job[0]}: {type(error).__name__}: {error}\n")
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return BatchResult(job[0], status, stdout.getvalue(), stderr.getvalue(), time.perf_counter() - start)
+
+
+# Runs independent scripts on a pool of worker processes, each keeping one warm Lox instance, and
+# yields their results in submission order as they become available
+class BatchRunner:
+    def __init__(self, workers=None, timeout=None, optimize=True, use_vm=False, compile_closures=False,
+                 use_cache=True):
+        # Initialize the runner; workers defaults to the number of CPUs and timeout (seconds) to none
+        self.workers = workers
+        self.timeout = timeout
+        self.optimize = optimize
+        self.options = {"use_vm": use_vm, "compile_closures": compile_closures, "use_cache": use_cache}
+
+    def run(self, jobs):
+        # Run (name, kind, payload) jobs as Lox.run_script does and yield a BatchResult for each, in order
+        with ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(self.optimize,)) as executor:
+            yield from executor.map(run_job, jobs, repeat(self.options), repeat(self.timeout))
+
+    def run_files(self, paths):
+        # Run script files and yield their results in order
+        return self.run([(path, "file", path) for path in paths])
+
+    def run_sources(self, sources):
+        # Run (name, source) pairs and yield their results in order
+        return self.run([(name, "source", source) for name, source in sources])
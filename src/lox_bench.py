@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+
+from lox import Lox
+
+# Directory holding the benchmark suite, one Lox program per .lox file
+BENCH_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bench")
+
+PHASES = ("scan", "parse", "resolve", "optimize", "interpret")
+
+ENGINES = {
+    "tree": {},
+    "closures": {"compile_closures": True},
+    "vm": {"use_vm": True},
+}
+
+
+# Runs the benchmark suite through the same phase methods Lox.run is made of, timing each phase over
+# repeated runs in fresh Lox instances and measuring peak memory per phase in one extra traced run
+class BenchmarkRunner:
+    def __init__(self, repeats=5, engine="tree", optimize=True):
+        # Initialize the runner with the number of timed runs, the execution engine and optimizer setting
+        self.repeats = repeats
+        self.engine = engine
+        self.optimize = optimize
+
+    def load_suite(self, directory=BENCH_DIRECTORY, names=None):
+        # Read the benchmark programs, keyed by file name without extension, optionally only those named
+        suite = {}
+        for file_name in sorted(os.listdir(directory)):
+            name, extension = os.path.splitext(file_name)
+            if extension != ".lox" or (names and name not in names):
+                continue
+            with open(os.path.join(directory, file_name), "r") as f:
+                suite[name] = f.read()
+        missing = set(names or ()) - set(suite)
+        if missing:
+            raise ValueError("Unknown benchmarks: " + ", ".join(sorted(missing)))
+        return suite
+
+    def run_phases(self, source, measure):
+        # Run a program phase by phase, letting measure(results, phase, step) record a number per phase,
+        # where step performs the phase; program output is discarded and the results are returned
+        lox = Lox(self.optimize)
+        options = ENGINES[self.engine]
+        results = {}
+        with redirect_stdout(StringIO()):
+            tokens = measure(results, "scan", lambda: lox.scan(source))
+            statements = measure(results, "parse", lambda: lox.parse(tokens))
+            statements = measure(results, "resolve", lambda: lox.resolve(statements))
+            statements = measure(results, "optimize", lambda: lox.optimize(statements))
+            measure(results, "interpret", lambda: lox.execute(statements, **options))
+        return results
+
+    def time_phase(self, results, phase, step):
+        # Run one phase and record its wall-clock time
+        start = time.perf_counter()
+        value = step()
+        results[phase] = time.perf_counter() - start
+        return value
+
+    def trace_phase(self, results, phase, step):
+        # Run one phase and record the peak memory it allocated above what was live when it started
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        value = step()
+        results[phase] = tracemalloc.get_traced_memory()[1] - baseline
+        return value
+
+    def run_benchmark(self, source):
+        # Time every phase of a program over the configured repeats and measure its memory once
+        timings = [self.run_phases(source, self.time_phase) for _ in range(self.repeats)]
+        tracemalloc.start()
+        try:
+            memory = self.run_phases(source, self.trace_phase)
+        finally:
+            tracemalloc.stop()
+        totals = [sum(timing.values()) for timing in timings]
+        phases = {}
+        for phase in PHASES:
+            times = [timing[phase] for timing in timings]
+            phases[phase] = {
+                "min": min(times),
+                "median": statistics.median(times),
+                "peak_memory": memory[phase],
+            }
+        return {
+            "phases": phases,
+            "total": {"min": min(totals), "median": statistics.median(totals)},
+        }
+
+    def run(self, suite):
+        # Run every benchmark in the suite and return the machine-readable report
+        return {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "engine": self.engine,
+            "optimize": self.optimize,
+            "repeats": self.repeats,
+            "time_unit": "seconds",
+            "memory_unit": "bytes",
+            "benchmarks": {name: self.run_benchmark(source) for name, source in suite.items()},
+        }
+
+    def main(self, argv=None):
+        # Parse command line options, run the suite and write the JSON report to stdout or a file
+        parser = argparse.ArgumentParser(prog="lox bench", description="Run the Lox benchmark suite.")
+        parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+        parser.add_argument("--repeats", type=int, default=self.repeats, help="timed runs per benchmark")
+        parser.add_argument("--engine", choices=sorted(ENGINES), default=self.engine, help="execution engine")
+        parser.add_argument("--no-optimize", action="store_true", help="skip the constant folding pass")
+        parser.add_argument("--suite", default=BENCH_DIRECTORY, help="directory of .lox benchmark programs")
+        parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+        args = parser.parse_args(argv)
+        self.repeats = args.repeats
+        self.engine = args.engine
+        self.optimize = not args.no_optimize
+        try:
+            suite = self.load_suite(args.suite, args.names)
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+        report = self.run(suite)
+        text = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(BenchmarkRunner().main())
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import pickle
+import sys
+import zlib
+
+import Expr
+import Stmt
+
+# Bump whenever the meaning of a cached tree changes without its node layout changing,
+# e.g. when the resolver starts assigning slots differently
+CACHE_VERSION = 2
+
+CACHE_DIRECTORY = "__loxcache__"
+MAGIC = b"LOXC"
+
+
+def interpreter_fingerprint():
+    # Describe everything a cached tree depends on besides the source: the cache format version,
+    # the Python version (pickle layout) and the fields of every AST node class
+    parts = [str(CACHE_VERSION), "%d.%d" % sys.version_info[:2]]
+    for module in (Expr, Stmt):
+        for name, value in sorted(vars(module).items()):
+            if isinstance(value, type) and "__slots__" in vars(value):
+                parts.append(f"{module.__name__}.{name}{value.__slots__}")
+    return "\n".join(parts).encode()
+
+
+# On-disk cache of parsed and resolved statement trees, stored next to each script in a
+# __loxcache__ directory (like __pycache__ for .py files). An entry is the magic bytes, a digest
+# of the interpreter fingerprint and the source, then the zlib-compressed pickled tree
+class AstCache:
+    def __init__(self, optimized=False):
+        # Compute the interpreter fingerprint once; it is mixed into every source digest. Optimized
+        # and unoptimized trees get different digests, so switching the optimizer rewrites entries
+        self.fingerprint = interpreter_fingerprint() + (b"\noptimized" if optimized else b"")
+
+    def cache_path(self, path):
+        # Return the cache file used for the script at path
+        directory, file_name = os.path.split(os.path.abspath(path))
+        return os.path.join(directory, CACHE_DIRECTORY, os.path.splitext(file_name)[0] + ".loxc")
+
+    def header(self, source):
+        # Return the header an up-to-date cache entry for source starts with
+        digest = hashlib.sha256(self.fingerprint)
+        digest.update(source.encode("utf-8", "surrogatepass"))
+        return MAGIC + digest.digest()
+
+    def load(self, path, source):
+        # Return the cached statements for source, or None if there is no up-to-date entry
+        header = self.header(source)
+        try:
+            with open(self.cache_path(path), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if not data.startswith(header):
+            return None
+        try:
+            return pickle.loads(zlib.decompress(data[len(header):]))
+        except Exception:
+            # A truncated or otherwise corrupt entry is treated as a miss and rewritten
+            return None
+
+    def store(self, path, source, statements):
+        # Write the resolved statements for source, ignoring failures like a read-only directory
+        cache_path = self.cache_path(path)
+        try:
+            data = zlib.compress(pickle.dumps(statements, pickle.HIGHEST_PROTOCOL), 1)
+        except RecursionError:
+            return
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(temp_path, "wb") as f:
+                f.write(self.header(source))
+                f.write(data)
+            # Replace atomically so concurrent runs never read a partially written entry
+            os.replace(temp_path, cache_path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
@@ -3,6 +3,8 @@ from abc import ABC, abstractmethod
 
 # Abstract base class for Lox callable entities (e.g., functions, classes)
 class LoxCallable(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def call(self, interpreter, arguments):
         # Abstract method to call the entity with the given arguments
@@ -0,0 +1,137 @@
+# Opcodes understood by the virtual machine. Each opcode is followed in the code list by
+# the number of integer operands given in OPERAND_COUNTS.
+OP_CONSTANT = 0
+OP_NIL = 1
+OP_TRUE = 2
+OP_FALSE = 3
+OP_POP = 4
+OP_GET_LOCAL = 5
+OP_SET_LOCAL = 6
+OP_GET_GLOBAL = 7
+OP_DEFINE_GLOBAL = 8
+OP_SET_GLOBAL = 9
+OP_GET_UPVALUE = 10
+OP_SET_UPVALUE = 11
+OP_GET_PROPERTY = 12
+OP_SET_PROPERTY = 13
+OP_GET_SUPER = 14
+OP_EQUAL = 15
+OP_NOT_EQUAL = 16
+OP_GREATER = 17
+OP_GREATER_EQUAL = 18
+OP_LESS = 19
+OP_LESS_EQUAL = 20
+OP_ADD = 21
+OP_SUBTRACT = 22
+OP_MULTIPLY = 23
+OP_DIVIDE = 24
+OP_NOT = 25
+OP_NEGATE = 26
+OP_PRINT = 27
+OP_JUMP = 28
+OP_JUMP_IF_FALSE = 29
+OP_JUMP_IF_TRUE = 30
+OP_POP_JUMP_IF_FALSE = 31
+OP_CALL = 32
+OP_CLOSURE = 33
+OP_CLOSE_UPVALUE = 34
+OP_RETURN = 35
+OP_CLASS = 36
+OP_INHERIT = 37
+OP_METHOD = 38
+OP_INVOKE = 39
+OP_BUILD_LIST = 40
+OP_GET_INDEX = 41
+OP_SET_INDEX = 42
+
+OPCODE_NAMES = {value: name for name, value in globals().items() if name.startswith("OP_")}
+
+OPERAND_COUNTS = {
+    OP_CONSTANT: 1,
+    OP_GET_LOCAL: 1,
+    OP_SET_LOCAL: 1,
+    OP_GET_GLOBAL: 1,
+    OP_DEFINE_GLOBAL: 1,
+    OP_SET_GLOBAL: 1,
+    OP_GET_UPVALUE: 1,
+    OP_SET_UPVALUE: 1,
+    OP_GET_PROPERTY: 1,
+    OP_SET_PROPERTY: 1,
+    OP_GET_SUPER: 1,
+    OP_JUMP: 1,
+    OP_JUMP_IF_FALSE: 1,
+    OP_JUMP_IF_TRUE: 1,
+    OP_POP_JUMP_IF_FALSE: 1,
+    OP_CALL: 1,
+    OP_CLOSURE: 1,
+    OP_CLASS: 1,
+    OP_METHOD: 1,
+    OP_INVOKE: 2,
+    OP_BUILD_LIST: 1,
+}
+
+
+# A chunk of bytecode: a flat list of opcodes and operands, a constant pool and the
+# source line of every code slot
+class Chunk:
+    def __init__(self):
+        # Initialize an empty chunk
+        self.code = []
+        self.lines = []
+        self.constants = []
+        self.constant_indexes = {}
+
+    def write(self, value, line):
+        # Append an opcode or operand and record the line it came from
+        self.code.append(value)
+        self.lines.append(line)
+        return len(self.code) - 1
+
+    def add_constant(self, value):
+        # Add a value to the constant pool, reusing the slot of an identical literal. Floats are keyed
+        # by their repr, since 0.0 and -0.0 compare equal but print differently
+        if isinstance(value, (bool, int, float, str)):
+            key = (float, repr(value)) if type(value) is float else (type(value), value)
+            index = self.constant_indexes.get(key)
+            if index is None:
+                index = len(self.constants)
+                self.constants.append(value)
+                self.constant_indexes[key] = index
+            return index
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def disassemble(self, name):
+        # Return a human-readable listing of the chunk, one instruction per line
+        out = [f"== {name} =="]
+        offset = 0
+        while offset < len(self.code):
+            op = self.code[offset]
+            operands = self.code[offset + 1:offset + 1 + OPERAND_COUNTS.get(op, 0)]
+            text = f"{offset:04d} {self.lines[offset]:4d} {OPCODE_NAMES[op]:<22}"
+            if operands:
+                text += " " + " ".join(str(operand) for operand in operands)
+            if op in (OP_CONSTANT, OP_GET_GLOBAL, OP_DEFINE_GLOBAL, OP_SET_GLOBAL, OP_GET_PROPERTY,
+                      OP_SET_PROPERTY, OP_GET_SUPER, OP_CLOSURE, OP_CLASS, OP_METHOD, OP_INVOKE):
+                text += f" '{self.constants[operands[0]]}'"
+            out.append(text)
+            offset += 1 + len(operands)
+            if op == OP_CLOSURE:
+                offset += 2 * self.constants[operands[0]].upvalue_count
+        return "\n".join(out)
+
+
+# A compiled function: its name, arity, bytecode and the number of upvalues it captures
+class FunctionProto:
+    def __init__(self, name, arity=0):
+        # Initialize the function prototype with an empty chunk
+        self.name = name
+        self.arity = arity
+        self.chunk = Chunk()
+        self.upvalue_count = 0
+
+    def __str__(self):
+        # Return the string representation of the compiled function
+        if self.name is None:
+            return "<script>"
+        return "<fn " + self.name + ">"
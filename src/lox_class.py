@@ -9,27 +9,39 @@ class LoxClass(LoxCallable):
         self.name = name
         self.super_class = super_class
         self.methods = methods
+        # Flattened lookup table: inherited methods overridden by the class's own methods
+        self.method_table = {}
+        if super_class is not None:
+            self.method_table.update(super_class.method_table)
+        self.method_table.update(methods)
 
     def __str__(self):
         # Return the name of the class
         return self.name
 
+    def inherit(self, super_class):
+        # Set the superclass of a class under construction and copy down its methods
+        self.super_class = super_class
+        self.method_table = dict(super_class.method_table)
+        self.method_table.update(self.methods)
+
+    def add_method(self, name, method):
+        # Add a method to a class under construction
+        self.methods[name] = method
+        self.method_table[name] = method
+
     def find_method(self, name):
         # Find a method in the class or its superclass
-        try:
-            return self.methods[name]
-        except KeyError:
-            pass
-        if self.super_class is not None:
-            return self.super_class.find_method(name)
-        return None
+        return self.method_table.get(name)
 
     def call(self, interpreter, args):
         # Create a new instance of the class and initialize it if there is an initializer method
+        if interpreter.stats is not None:
+            interpreter.stats.instances += 1
         instance = LoxInstance(self)
         initializer = self.find_method("init")
         if initializer is not None:
-            initializer.bind(instance).call(interpreter, args)
+            initializer.invoke(interpreter, instance, args)
         return instance
 
     def arity(self):
@@ -0,0 +1,423 @@
+import Expr
+import Stmt
+from token_type import TokenType
+from environment import Environment
+from lox_function import LoxFunction
+from lox_native import NativeFunction
+from lox_return import RETURN
+from lox_class import LoxClass
+from lox_instance import LoxInstance
+from lox_list import LoxList
+from lox_operators import BINARY_OPERATORS, UNARY_OPERATORS
+from lox_values import stringify
+
+
+# A Lox function whose body has been compiled into a Python closure
+class CompiledFunction(LoxFunction):
+    __slots__ = ('body',)
+
+    def __init__(self, declaration, body, closure, is_initializer):
+        # Initialize the function with its declaration, compiled body, closure environment and initializer flag
+        super().__init__(declaration, closure, is_initializer)
+        self.body = body
+
+    def run_body(self, interpreter, environment):
+        # Run the compiled body in the given environment and return the returned value, through
+        # the interpreter's profiler when one is enabled
+        if interpreter.profiler is not None:
+            return interpreter.profiler.profile_call(self, self.execute_body, interpreter, environment)
+        if self.body(environment) is RETURN:
+            return interpreter.return_value
+        return None
+
+    def execute_body(self, interpreter, environment):
+        # Run the compiled body without profiling
+        if self.body(environment) is RETURN:
+            return interpreter.return_value
+        return None
+
+    def bind(self, instance):
+        # Bind the function to an instance without recompiling its body
+        environment = Environment(self.closure)
+        environment.define("this", instance)
+        return CompiledFunction(self.declaration, self.body, environment, self.is_initializer)
+
+
+# Compiler that turns resolved Stmt/Expr trees into nested Python closures taking the current environment,
+# so operator dispatch and scope distances are decided once instead of on every evaluation
+class ClosureCompiler(Expr.ExprVisitor, Stmt.StmtVisitor):
+    def __init__(self, interpreter):
+        # Initialize the compiler with the interpreter whose globals and output it uses
+        self.interpreter = interpreter
+        self.scope_depth = 0
+
+    def compile(self, statements):
+        # Compile a list of statements into a single closure that runs them in order
+        return self.sequence(statements)
+
+    def compile_node(self, node):
+        # Compile a statement or expression by accepting it
+        return node.accept(self)
+
+    def define_variable(self, name):
+        # Build a closure that binds a new variable: by name at the top level, in the next slot in local scopes
+        if self.scope_depth == 0:
+            def define_global(env, value):
+                env.values[name] = value
+            return define_global
+
+        def define_local(env, value):
+            env.slots.append(value)
+        return define_local
+
+    def scoped_sequence(self, stmts):
+        # Compile the statements of a block or function body, whose declarations go into local slots
+        self.scope_depth += 1
+        body = self.sequence(stmts)
+        self.scope_depth -= 1
+        return body
+
+    def sequence(self, stmts):
+        # Compile a list of statements into a closure that executes them one after another. Compiled
+        # statements return RETURN after running a return statement and anything else otherwise
+        # (expression statements return their value), so only identity with RETURN is checked
+        compiled = [self.compile_node(stmt) for stmt in stmts if stmt is not None]
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def run(env):
+            for stmt in compiled:
+                if stmt(env) is RETURN:
+                    return RETURN
+        return run
+
+    def visit_literal_expr(self, expr):
+        # Compile a literal expression into a closure returning its value
+        value = expr.value
+        return lambda env: value
+
+    def visit_grouping_expr(self, expr):
+        # Compile a grouping expression to its inner expression
+        return self.compile_node(expr.expr)
+
+    def visit_list_expr(self, expr):
+        # Compile a list literal into a closure building a new list
+        elements = [self.compile_node(element) for element in expr.elements]
+        return lambda env: LoxList([element(env) for element in elements])
+
+    def visit_index_expr(self, expr):
+        # Compile a list element read
+        object = self.compile_node(expr.object)
+        index = self.compile_node(expr.index)
+
+        def get_index(env):
+            target = object(env)
+            if type(target) is not LoxList:
+                raise RuntimeError("Only lists can be indexed.")
+            return target.get(index(env))
+        return get_index
+
+    def visit_indexset_expr(self, expr):
+        # Compile a list element assignment
+        object = self.compile_node(expr.object)
+        index = self.compile_node(expr.index)
+        value = self.compile_node(expr.value)
+
+        def set_index(env):
+            target = object(env)
+            if type(target) is not LoxList:
+                raise RuntimeError("Only lists can be indexed.")
+            position = index(env)
+            result = value(env)
+            target.set(position, result)
+            return result
+        return set_index
+
+    def visit_logical_expr(self, expr):
+        # Compile a short-circuiting logical expression
+        left = self.compile_node(expr.left)
+        right = self.compile_node(expr.right)
+        if expr.operator.type == TokenType.OR:
+            def logical_or(env):
+                value = left(env)
+                if value is not None and value is not False:
+                    return value
+                return right(env)
+            return logical_or
+
+        def logical_and(env):
+            value = left(env)
+            if value is None or value is False:
+                return value
+            return right(env)
+        return logical_and
+
+    def visit_unary_expr(self, expr):
+        # Compile a unary expression around the shared operator implementation, selected once here
+        right = self.compile_node(expr.right)
+        operator = UNARY_OPERATORS.get(expr.operator.type)
+        if operator is None:
+            return lambda env: None
+        return lambda env: operator(right(env))
+
+    def visit_binary_expr(self, expr):
+        # Compile a binary expression around the shared operator implementation, selected once here
+        left = self.compile_node(expr.left)
+        right = self.compile_node(expr.right)
+        operator = BINARY_OPERATORS.get(expr.operator.type)
+        if operator is None:
+            return lambda env: None
+        return lambda env: operator(left(env), right(env))
+
+    def visit_variable_expr(self, expr):
+        # Compile a variable read using the scope distance and slot the resolver stored on the node
+        return self.variable_reader(expr.name.lexeme, expr.depth, expr.slot)
+
+    def visit_this_expr(self, expr):
+        # Compile a 'this' expression
+        return self.variable_reader("this", expr.depth, expr.slot)
+
+    def variable_reader(self, name, distance, slot):
+        # Build a closure that reads a variable at a fixed distance and slot, or from the globals
+        if distance is None:
+            global_values = self.interpreter.globals.values
+
+            def read_global(env):
+                try:
+                    return global_values[name]
+                except KeyError:
+                    raise RuntimeError("Undefined variable " + name + ".")
+            return read_global
+        if distance == 0:
+            return lambda env: env.slots[slot]
+        if distance == 1:
+            return lambda env: env.enclosing.slots[slot]
+        return lambda env: env.ancestor(distance).slots[slot]
+
+    def visit_assign_expr(self, expr):
+        # Compile an assignment using the scope distance found by the resolver
+        value = self.compile_node(expr.value)
+        name = expr.name.lexeme
+        distance = expr.depth
+        slot = expr.slot
+        if distance is None:
+            global_values = self.interpreter.globals.values
+
+            def assign_global(env):
+                result = value(env)
+                if name not in global_values:
+                    raise RuntimeError("Undefined variable '" + name + "'.")
+                global_values[name] = result
+                return result
+            return assign_global
+
+        def assign_local(env):
+            result = value(env)
+            env.ancestor(distance).slots[slot] = result
+            return result
+        return assign_local
+
+    def visit_call_expr(self, expr):
+        # Compile a call expression; method calls on instances skip creating a bound method
+        arguments = [self.compile_node(argument) for argument in expr.arguments]
+        interpreter = self.interpreter
+        if isinstance(expr.callee, Expr.Get):
+            get_expr = expr.callee
+            object = self.compile_node(get_expr.object)
+            name = get_expr.name.lexeme
+
+            def invoke(env):
+                instance = object(env)
+                if isinstance(instance, LoxInstance) and name not in instance.fields:
+                    method = interpreter.find_method(get_expr, instance)
+                    args = [argument(env) for argument in arguments]
+                    if len(args) != method.arity():
+                        raise RuntimeError(f"Expected {method.arity()} arguments but got {len(args)}.")
+                    return method.invoke(interpreter, instance, args)
+                return interpreter.call(interpreter.get_property(get_expr, instance),
+                                        [argument(env) for argument in arguments])
+            return invoke
+        callee = self.compile_node(expr.callee)
+
+        def call(env):
+            function = callee(env)
+            args = [argument(env) for argument in arguments]
+            if type(function) is NativeFunction and len(args) == function.param_count:
+                return function.function(*args)
+            return interpreter.call(function, args)
+        return call
+
+    def visit_get_expr(self, expr):
+        # Compile a property access
+        object = self.compile_node(expr.object)
+        get_property = self.interpreter.get_property
+        return lambda env: get_property(expr, object(env))
+
+    def visit_set_expr(self, expr):
+        # Compile a property assignment
+        object = self.compile_node(expr.object)
+        value = self.compile_node(expr.value)
+        name = expr.name
+
+        def set_property(env):
+            instance = object(env)
+            if not isinstance(instance, LoxInstance):
+                raise RuntimeError("Only instances have fields")
+            result = value(env)
+            instance.set(name, result)
+            return result
+        return set_property
+
+    def visit_super_expr(self, expr):
+        # Compile a superclass method access bound to the current instance
+        distance = expr.depth
+        slot = expr.slot
+        if distance is None:
+            raise RuntimeError("Unresolved variable 'super'.")
+        method_name = expr.method.lexeme
+        stats = self.interpreter.stats
+
+        def super_method(env):
+            super_class = env.get_at(distance, slot)
+            instance = env.get_at(distance - 1, 0)
+            method = super_class.find_method(method_name)
+            if method is None:
+                raise RuntimeError(f"Undefined property '{method_name}'.")
+            if stats is not None:
+                stats.binds += 1
+                stats.environments += 1
+            return method.bind(instance)
+        return super_method
+
+    def visit_expression_stmt(self, stmt):
+        # Compile an expression statement
+        return self.compile_node(stmt.expr)
+
+    def visit_print_stmt(self, stmt):
+        # Compile a print statement
+        value = self.compile_node(stmt.expr)
+        write_line = self.interpreter.output.write_line
+        return lambda env: write_line(stringify(value(env)))
+
+    def visit_var_stmt(self, stmt):
+        # Compile a variable declaration
+        name = stmt.name.lexeme
+        initializer = self.compile_node(stmt.initializer) if stmt.initializer is not None else lambda env: None
+        if self.scope_depth == 0:
+            def define_global(env):
+                env.values[name] = initializer(env)
+            return define_global
+
+        def define_local(env):
+            env.slots.append(initializer(env))
+        return define_local
+
+    def visit_block_stmt(self, stmt):
+        # Compile a block statement that runs in its own environment
+        body = self.scoped_sequence(stmt.stmts)
+        stats = self.interpreter.stats
+        if stats is not None:
+            def counted_block(env):
+                stats.environments += 1
+                return body(Environment(env))
+            return counted_block
+        return lambda env: body(Environment(env))
+
+    def visit_if_stmt(self, stmt):
+        # Compile an if statement
+        condition = self.compile_node(stmt.condition)
+        then_branch = self.compile_node(stmt.then_branch)
+        else_branch = self.compile_node(stmt.else_branch) if stmt.else_branch is not None else None
+
+        def if_stmt(env):
+            value = condition(env)
+            if value is not None and value is not False:
+                return then_branch(env)
+            elif else_branch is not None:
+                return else_branch(env)
+        return if_stmt
+
+    def visit_while_stmt(self, stmt):
+        # Compile a while statement
+        condition = self.compile_node(stmt.condition)
+        body = self.compile_node(stmt.body)
+
+        def while_stmt(env):
+            value = condition(env)
+            while value is not None and value is not False:
+                if body(env) is RETURN:
+                    return RETURN
+                value = condition(env)
+        return while_stmt
+
+    def visit_return_stmt(self, stmt):
+        # Compile a return statement that records its value on the interpreter and signals RETURN
+        interpreter = self.interpreter
+        if stmt.value is None:
+            def return_nil(env):
+                interpreter.return_value = None
+                return RETURN
+            compiled = return_nil
+        else:
+            value = self.compile_node(stmt.value)
+
+            def return_value(env):
+                interpreter.return_value = value(env)
+                return RETURN
+            compiled = return_value
+        stats = interpreter.stats
+        if stats is not None:
+            def counted_return(env):
+                stats.returns += 1
+                return compiled(env)
+            return counted_return
+        return compiled
+
+    def visit_function_stmt(self, stmt):
+        # Compile a function declaration; the body is compiled once and shared by every closure
+        body = self.scoped_sequence(stmt.body)
+        define = self.define_variable(stmt.name.lexeme)
+
+        def function(env):
+            define(env, CompiledFunction(stmt, body, env, False))
+        return function
+
+    def visit_class_stmt(self, stmt):
+        # Compile a class declaration and the bodies of its methods
+        name = stmt.name.lexeme
+        super_class_expr = self.compile_node(stmt.super_class) if stmt.super_class is not None else None
+        methods = [(method, self.scoped_sequence(method.body)) for method in stmt.methods]
+        define = self.define_variable(name)
+        interpreter = self.interpreter
+
+        def class_stmt(env):
+            super_class = None
+            if super_class_expr is not None:
+                super_class = super_class_expr(env)
+                if not isinstance(super_class, LoxClass):
+                    raise RuntimeError("Superclass must be a class.")
+            method_env = env
+            if super_class is not None:
+                if interpreter.stats is not None:
+                    interpreter.stats.environments += 1
+                method_env = Environment(env)
+                method_env.slots.append(super_class)
+            functions = {}
+            for method, body in methods:
+                functions[method.name.lexeme] = CompiledFunction(method, body, method_env, method.name.lexeme == "init")
+            if interpreter.profiler is not None:
+                interpreter.profiler.define_class(name, functions)
+            define(env, LoxClass(name, super_class, functions))
+        return class_stmt
+
+    def visit_input_stmt(self, stmt):
+        # Compile an input statement as a call to the native input function
+        prompt = self.compile_node(stmt.expression)
+        name = stmt.name.lexeme
+        interpreter = self.interpreter
+        define = self.define_variable(name)
+
+        def input_stmt(env):
+            define(env, interpreter.globals.values["input"].call(interpreter, [prompt(env)]))
+        return input_stmt
+
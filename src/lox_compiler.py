@@ -0,0 +1,425 @@
+import enum
+import Expr
+import Stmt
+from token_type import TokenType
+from lox_chunk import *
+
+
+# Enum to represent the kind of function being compiled
+class FunctionKind(enum.Enum):
+    SCRIPT = enum.auto()
+    FUNCTION = enum.auto()
+    INITIALIZER = enum.auto()
+    METHOD = enum.auto()
+
+
+# A local variable slot in the function being compiled
+class Local:
+    def __init__(self, name, depth):
+        # Initialize the local with its name and the scope depth it was declared in
+        self.name = name
+        self.depth = depth
+        self.is_captured = False
+
+
+# Per-function compilation state: the prototype being filled in, its locals and upvalues
+class FunctionState:
+    def __init__(self, enclosing, proto, kind):
+        # Initialize the state; slot 0 holds the callee, or the receiver inside methods
+        self.enclosing = enclosing
+        self.proto = proto
+        self.kind = kind
+        self.locals = [Local("this" if kind in (FunctionKind.METHOD, FunctionKind.INITIALIZER) else "", 0)]
+        self.upvalues = []
+        self.scope_depth = 0
+
+
+# Compiler that turns resolved Stmt/Expr trees into bytecode for the virtual machine
+class Compiler(Expr.ExprVisitor, Stmt.StmtVisitor):
+    def __init__(self):
+        # Initialize the compiler with no function being compiled
+        self.state = None
+        self.line = 0
+
+    def compile(self, statements):
+        # Compile a list of top-level statements into the script function
+        self.state = FunctionState(None, FunctionProto(None), FunctionKind.SCRIPT)
+        for stmt in statements:
+            self.compile_node(stmt)
+        self.emit_return()
+        proto = self.state.proto
+        self.state = None
+        return proto
+
+    def compile_node(self, node):
+        # Compile a statement or expression by accepting it
+        node.accept(self)
+
+    def chunk(self):
+        # Return the chunk of the function currently being compiled
+        return self.state.proto.chunk
+
+    def emit(self, *values):
+        # Emit an opcode and its operands, returning the offset of the last one written
+        chunk = self.chunk()
+        offset = -1
+        for value in values:
+            offset = chunk.write(value, self.line)
+        return offset
+
+    def emit_constant(self, value):
+        # Emit an instruction that pushes a constant
+        self.emit(OP_CONSTANT, self.chunk().add_constant(value))
+
+    def emit_jump(self, op):
+        # Emit a jump with a placeholder target and return the offset of the target operand
+        return self.emit(op, -1)
+
+    def patch_jump(self, offset):
+        # Point a previously emitted jump at the current end of the code
+        self.chunk().code[offset] = len(self.chunk().code)
+
+    def emit_return(self):
+        # Emit the implicit return at the end of a function body
+        if self.state.kind is FunctionKind.INITIALIZER:
+            self.emit(OP_GET_LOCAL, 0)
+        else:
+            self.emit(OP_NIL)
+        self.emit(OP_RETURN)
+
+    def identifier_constant(self, name):
+        # Add a variable or property name to the constant pool
+        return self.chunk().add_constant(name)
+
+    def begin_scope(self):
+        # Begin a new block scope
+        self.state.scope_depth += 1
+
+    def end_scope(self):
+        # End the current scope, discarding its locals and closing captured ones
+        state = self.state
+        state.scope_depth -= 1
+        while state.locals and state.locals[-1].depth > state.scope_depth:
+            if state.locals[-1].is_captured:
+                self.emit(OP_CLOSE_UPVALUE)
+            else:
+                self.emit(OP_POP)
+            state.locals.pop()
+
+    def add_local(self, name):
+        # Claim the next stack slot for a local variable
+        self.state.locals.append(Local(name, self.state.scope_depth))
+
+    def define_variable(self, name):
+        # Bind the value on top of the stack to a newly declared variable
+        if self.state.scope_depth > 0:
+            self.add_local(name)
+        else:
+            self.emit(OP_DEFINE_GLOBAL, self.identifier_constant(name))
+
+    def resolve_local(self, state, name):
+        # Find the stack slot of a local variable in the given function, or -1
+        for slot in range(len(state.locals) - 1, -1, -1):
+            if state.locals[slot].name == name:
+                return slot
+        return -1
+
+    def add_upvalue(self, state, is_local, index):
+        # Add an upvalue to the given function, reusing an existing one for the same variable
+        for i, upvalue in enumerate(state.upvalues):
+            if upvalue == (is_local, index):
+                return i
+        state.upvalues.append((is_local, index))
+        state.proto.upvalue_count = len(state.upvalues)
+        return len(state.upvalues) - 1
+
+    def resolve_upvalue(self, state, name):
+        # Find a variable captured from an enclosing function, or -1
+        if state.enclosing is None:
+            return -1
+        local = self.resolve_local(state.enclosing, name)
+        if local != -1:
+            state.enclosing.locals[local].is_captured = True
+            return self.add_upvalue(state, 1, local)
+        upvalue = self.resolve_upvalue(state.enclosing, name)
+        if upvalue != -1:
+            return self.add_upvalue(state, 0, upvalue)
+        return -1
+
+    def named_variable(self, name, assign):
+        # Emit a load or store of a variable, choosing between local, upvalue and global access
+        slot = self.resolve_local(self.state, name)
+        if slot != -1:
+            self.emit(OP_SET_LOCAL if assign else OP_GET_LOCAL, slot)
+            return
+        index = self.resolve_upvalue(self.state, name)
+        if index != -1:
+            self.emit(OP_SET_UPVALUE if assign else OP_GET_UPVALUE, index)
+            return
+        self.emit(OP_SET_GLOBAL if assign else OP_GET_GLOBAL, self.identifier_constant(name))
+
+    def function(self, stmt, kind):
+        # Compile a function body into its own prototype and emit the closure that wraps it
+        self.state = FunctionState(self.state, FunctionProto(stmt.name.lexeme, len(stmt.params)), kind)
+        self.begin_scope()
+        for param in stmt.params:
+            self.add_local(param.lexeme)
+        for body_stmt in stmt.body:
+            self.compile_node(body_stmt)
+        self.emit_return()
+        state = self.state
+        self.state = state.enclosing
+        self.line = stmt.name.line
+        self.emit(OP_CLOSURE, self.chunk().add_constant(state.proto))
+        for is_local, index in state.upvalues:
+            self.emit(is_local, index)
+
+    def visit_block_stmt(self, stmt):
+        # Compile a block statement in its own scope
+        self.begin_scope()
+        for inner in stmt.stmts:
+            self.compile_node(inner)
+        self.end_scope()
+        return None
+
+    def visit_class_stmt(self, stmt):
+        # Compile a class declaration, its superclass link and its methods
+        self.line = stmt.name.line
+        name = stmt.name.lexeme
+        self.emit(OP_CLASS, self.identifier_constant(name))
+        self.define_variable(name)
+        if stmt.super_class is not None:
+            self.compile_node(stmt.super_class)
+            self.begin_scope()
+            self.add_local("super")
+            self.named_variable(name, False)
+            self.emit(OP_INHERIT)
+        self.named_variable(name, False)
+        for method in stmt.methods:
+            kind = FunctionKind.INITIALIZER if method.name.lexeme == "init" else FunctionKind.METHOD
+            self.function(method, kind)
+            self.emit(OP_METHOD, self.identifier_constant(method.name.lexeme))
+        self.emit(OP_POP)
+        if stmt.super_class is not None:
+            self.end_scope()
+        return None
+
+    def visit_expression_stmt(self, stmt):
+        # Compile an expression statement and discard its value
+        self.compile_node(stmt.expr)
+        self.emit(OP_POP)
+        return None
+
+    def visit_function_stmt(self, stmt):
+        # Compile a function declaration; locals are declared first so the body can recurse
+        self.line = stmt.name.line
+        if self.state.scope_depth > 0:
+            self.add_local(stmt.name.lexeme)
+        self.function(stmt, FunctionKind.FUNCTION)
+        if self.state.scope_depth == 0:
+            self.emit(OP_DEFINE_GLOBAL, self.identifier_constant(stmt.name.lexeme))
+        return None
+
+    def visit_if_stmt(self, stmt):
+        # Compile an if statement with forward jumps around the branches
+        self.compile_node(stmt.condition)
+        else_jump = self.emit_jump(OP_POP_JUMP_IF_FALSE)
+        self.compile_node(stmt.then_branch)
+        if stmt.else_branch is not None:
+            end_jump = self.emit_jump(OP_JUMP)
+            self.patch_jump(else_jump)
+            self.compile_node(stmt.else_branch)
+            self.patch_jump(end_jump)
+        else:
+            self.patch_jump(else_jump)
+        return None
+
+    def visit_print_stmt(self, stmt):
+        # Compile a print statement
+        self.compile_node(stmt.expr)
+        self.emit(OP_PRINT)
+        return None
+
+    def visit_return_stmt(self, stmt):
+        # Compile a return statement; initializers always return the receiver
+        self.line = stmt.keyword.line
+        if self.state.kind is FunctionKind.INITIALIZER:
+            self.emit(OP_GET_LOCAL, 0)
+        elif stmt.value is not None:
+            self.compile_node(stmt.value)
+        else:
+            self.emit(OP_NIL)
+        self.emit(OP_RETURN)
+        return None
+
+    def visit_var_stmt(self, stmt):
+        # Compile a variable declaration
+        self.line = stmt.name.line
+        if stmt.initializer is not None:
+            self.compile_node(stmt.initializer)
+        else:
+            self.emit(OP_NIL)
+        self.define_variable(stmt.name.lexeme)
+        return None
+
+    def visit_while_stmt(self, stmt):
+        # Compile a while loop as a conditional forward jump and a backward jump
+        loop_start = len(self.chunk().code)
+        self.compile_node(stmt.condition)
+        exit_jump = self.emit_jump(OP_POP_JUMP_IF_FALSE)
+        self.compile_node(stmt.body)
+        self.emit(OP_JUMP, loop_start)
+        self.patch_jump(exit_jump)
+        return None
+
+    def visit_input_stmt(self, stmt):
+        # Compile an input statement as a call to the native input function
+        self.line = stmt.name.line
+        self.emit(OP_GET_GLOBAL, self.identifier_constant("input"))
+        self.compile_node(stmt.expression)
+        self.emit(OP_CALL, 1)
+        self.define_variable(stmt.name.lexeme)
+        return None
+
+    def visit_assign_expr(self, expr):
+        # Compile an assignment expression; the assigned value stays on the stack
+        self.compile_node(expr.value)
+        self.line = expr.name.line
+        self.named_variable(expr.name.lexeme, True)
+        return None
+
+    def visit_binary_expr(self, expr):
+        # Compile a binary expression
+        self.compile_node(expr.left)
+        self.compile_node(expr.right)
+        self.line = expr.operator.line
+        self.emit(BINARY_OPCODES[expr.operator.type])
+        return None
+
+    def visit_call_expr(self, expr):
+        # Compile a call expression; method calls become a single invoke that skips the bound method
+        if isinstance(expr.callee, Expr.Get):
+            self.compile_node(expr.callee.object)
+            for argument in expr.arguments:
+                self.compile_node(argument)
+            self.line = expr.paren.line
+            self.emit(OP_INVOKE, self.identifier_constant(expr.callee.name.lexeme), len(expr.arguments))
+            return None
+        self.compile_node(expr.callee)
+        for argument in expr.arguments:
+            self.compile_node(argument)
+        self.line = expr.paren.line
+        self.emit(OP_CALL, len(expr.arguments))
+        return None
+
+    def visit_get_expr(self, expr):
+        # Compile a property access
+        self.compile_node(expr.object)
+        self.line = expr.name.line
+        self.emit(OP_GET_PROPERTY, self.identifier_constant(expr.name.lexeme))
+        return None
+
+    def visit_grouping_expr(self, expr):
+        # Compile a grouping expression
+        self.compile_node(expr.expr)
+        return None
+
+    def visit_index_expr(self, expr):
+        # Compile a list element read
+        self.compile_node(expr.object)
+        self.compile_node(expr.index)
+        self.line = expr.bracket.line
+        self.emit(OP_GET_INDEX)
+        return None
+
+    def visit_indexset_expr(self, expr):
+        # Compile a list element assignment
+        self.compile_node(expr.object)
+        self.compile_node(expr.index)
+        self.compile_node(expr.value)
+        self.line = expr.bracket.line
+        self.emit(OP_SET_INDEX)
+        return None
+
+    def visit_list_expr(self, expr):
+        # Compile a list literal: its elements are pushed, then collected into a new list
+        for element in expr.elements:
+            self.compile_node(element)
+        self.line = expr.bracket.line
+        self.emit(OP_BUILD_LIST, len(expr.elements))
+        return None
+
+    def visit_literal_expr(self, expr):
+        # Compile a literal expression
+        if expr.value is None:
+            self.emit(OP_NIL)
+        elif expr.value is True:
+            self.emit(OP_TRUE)
+        elif expr.value is False:
+            self.emit(OP_FALSE)
+        else:
+            self.emit_constant(expr.value)
+        return None
+
+    def visit_logical_expr(self, expr):
+        # Compile a short-circuiting logical expression
+        self.compile_node(expr.left)
+        self.line = expr.operator.line
+        if expr.operator.type == TokenType.OR:
+            end_jump = self.emit_jump(OP_JUMP_IF_TRUE)
+        else:
+            end_jump = self.emit_jump(OP_JUMP_IF_FALSE)
+        self.emit(OP_POP)
+        self.compile_node(expr.right)
+        self.patch_jump(end_jump)
+        return None
+
+    def visit_set_expr(self, expr):
+        # Compile a property assignment
+        self.compile_node(expr.object)
+        self.compile_node(expr.value)
+        self.line = expr.name.line
+        self.emit(OP_SET_PROPERTY, self.identifier_constant(expr.name.lexeme))
+        return None
+
+    def visit_super_expr(self, expr):
+        # Compile a superclass method access bound to the current receiver
+        self.line = expr.keyword.line
+        self.named_variable("this", False)
+        self.named_variable("super", False)
+        self.emit(OP_GET_SUPER, self.identifier_constant(expr.method.lexeme))
+        return None
+
+    def visit_this_expr(self, expr):
+        # Compile a 'this' expression
+        self.line = expr.keyword.line
+        self.named_variable("this", False)
+        return None
+
+    def visit_unary_expr(self, expr):
+        # Compile a unary expression
+        self.compile_node(expr.right)
+        self.line = expr.operator.line
+        self.emit(OP_NEGATE if expr.operator.type == TokenType.MINUS else OP_NOT)
+        return None
+
+    def visit_variable_expr(self, expr):
+        # Compile a variable read
+        self.line = expr.name.line
+        self.named_variable(expr.name.lexeme, False)
+        return None
+
+
+# Opcode emitted for each binary operator token
+BINARY_OPCODES = {
+    TokenType.PLUS: OP_ADD,
+    TokenType.MINUS: OP_SUBTRACT,
+    TokenType.STAR: OP_MULTIPLY,
+    TokenType.SLASH: OP_DIVIDE,
+    TokenType.EQUAL_EQUAL: OP_EQUAL,
+    TokenType.BANG_EQUAL: OP_NOT_EQUAL,
+    TokenType.GREATER: OP_GREATER,
+    TokenType.GREATER_EQUAL: OP_GREATER_EQUAL,
+    TokenType.LESS: OP_LESS,
+    TokenType.LESS_EQUAL: OP_LESS_EQUAL,
+}
@@ -1,10 +1,12 @@
 from lox_callable import LoxCallable
 from environment import Environment
-from lox_return import LoxReturn
+from lox_return import RETURN
 
 
 # Class representing a Lox function
 class LoxFunction(LoxCallable):
+    __slots__ = ('declaration', 'closure', 'is_initializer')
+
     def __init__(self, declaration, closure, is_initializer):
         # Initialize the function with its declaration, closure environment, and whether it is an initializer
         self.declaration = declaration
@@ -13,17 +15,45 @@ class LoxFunction(LoxCallable):
 
     def call(self, interpreter, arguments):
         # Call the function with the given arguments
+        stats = interpreter.stats
+        if stats is not None:
+            stats.calls += 1
+            stats.environments += 1
         environment = Environment(self.closure)
-        for i in range(len(self.declaration.params)):
-            environment.define(self.declaration.params[i].lexeme, arguments[i])
-        try:
-            interpreter.execute_block(self.declaration.body, environment)
-        except LoxReturn as return_value:
-            if self.is_initializer:
-                return self.closure.get_at(0, "this")
-            return return_value.value
+        environment.slots.extend(arguments)
+        value = self.run_body(interpreter, environment)
+        if self.is_initializer:
+            return self.closure.get_at(0, 0)
+        return value
+
+    def invoke(self, interpreter, instance, arguments):
+        # Call the function as a method of instance without creating a bound function first
+        stats = interpreter.stats
+        if stats is not None:
+            stats.calls += 1
+            stats.environments += 2
+        this_environment = Environment(self.closure)
+        this_environment.slots.append(instance)
+        environment = Environment(this_environment)
+        environment.slots.extend(arguments)
+        value = self.run_body(interpreter, environment)
         if self.is_initializer:
-            return self.closure.get_at(0, "this")
+            return instance
+        return value
+
+    def run_body(self, interpreter, environment):
+        # Execute the function body in the given environment and return the returned value, through
+        # the interpreter's profiler when one is enabled
+        if interpreter.profiler is not None:
+            return interpreter.profiler.profile_call(self, self.execute_body, interpreter, environment)
+        if interpreter.execute_block(self.declaration.body, environment) is RETURN:
+            return interpreter.return_value
+        return None
+
+    def execute_body(self, interpreter, environment):
+        # Execute the function body without profiling; run_body repeats this inline to save a call
+        if interpreter.execute_block(self.declaration.body, environment) is RETURN:
+            return interpreter.return_value
         return None
 
     def arity(self):
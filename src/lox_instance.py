@@ -1,4 +1,6 @@
 class LoxInstance:
+    __slots__ = ('klass', 'fields')
+
     def __init__(self, klass):
         # Initialize the instance with its class and an empty field dictionary
         self.klass = klass
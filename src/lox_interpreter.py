@@ -5,48 +5,75 @@ from token_type import TokenType
 from environment import Environment
 from lox_callable import LoxCallable
 from lox_function import LoxFunction
-from lox_return import LoxReturn
+from lox_native import NativeFunction
+from lox_stdlib import STDLIB
+from lox_return import RETURN
 from lox_class import LoxClass
 from lox_instance import LoxInstance
+from lox_list import LoxList
+from lox_closure_compiler import ClosureCompiler
+from lox_output import OutputBuffer
+from lox_operators import BINARY_OPERATORS, UNARY_OPERATORS
+from lox_values import stringify
 
 
 class Interpreter(Expr.ExprVisitor, Stmt.StmtVisitor):
-    def __init__(self) -> None:
-        # Initialize the interpreter with a global environment and a map for local variable scopes
+    def __init__(self, output=None, profiler=None, stats=None, natives=None) -> None:
+        # Initialize the interpreter with a global environment. Printed lines are buffered and written
+        # to the output text stream (sys.stdout by default), e.g. an io.StringIO to capture them. Passing
+        # a lox_profiler.Profiler records where programs spend their time, and a lox_stats.ExecutionStats
+        # counts the work done, readable from self.stats once interpret() returns. natives maps global
+        # names to host-provided natives, defined next to clock and input (see define_native)
+        self.output = OutputBuffer(output)
+        self.profiler = profiler
+        self.stats = stats
+        self.natives = {}
         self.globals = Environment()
         self.environment = self.globals
-        self.locals = {}
+        # Value of the return statement that last completed with the RETURN signal
+        self.return_value = None
         self.init_globals()
+        for name, native in (natives or {}).items():
+            self.define_native(name, native)
 
     def init_globals(self):
-        # Define native functions in the global environment
-        class Clock(LoxCallable):
-            def __init__(self) -> None:
-                super().__init__()
-                self.start_time = time()
-
-            def arity(self):
-                return 0
-
-            def call(self, interpreter, arguments):
-                return time() - self.start_time
-
-            def __str__(self):
-                return "<native fn>"
-
-        class InputFunction(LoxCallable):
-            def arity(self):
-                return 1
-
-            def call(self, interpreter, arguments):
-                prompt = arguments[0]
+        # Define native functions in the global environment: the standard library of lox_stdlib.py,
+        # clock and input, then the host's natives
+        self.globals.values.update(STDLIB.natives)
+        start_time = time()
+        output = self.output
+
+        def clock():
+            return time() - start_time
+
+        def read_input(prompt):
+            output.flush()
+            try:
                 return input(prompt)
-
-            def __str__(self):
-                return "<native fn 'input'>"
-
-        self.globals.define("clock", Clock())
-        self.globals.define("input", InputFunction())
+            except EOFError:
+                # Closed or exhausted stdin is a runtime error of the script, not of the interpreter
+                raise RuntimeError("Unexpected end of input.")
+
+        self.globals.define("clock", NativeFunction(clock))
+        self.globals.define("input", NativeFunction(read_input, "input"))
+        for name, native in self.natives.items():
+            self.globals.define(name, native)
+
+    def define_native(self, name, native):
+        # Register a host-provided native as a global: a LoxCallable, or a Python function, which is
+        # wrapped in a NativeFunction. Like clock and input it is defined again whenever the globals are reset
+        if not isinstance(native, LoxCallable):
+            native = NativeFunction(native, name)
+        self.natives[name] = native
+        self.globals.define(name, native)
+
+    def reset_globals(self):
+        # Forget every global defined by earlier programs, keeping the native functions. The global
+        # environment object itself is kept, since the VM shares it
+        self.globals.values.clear()
+        self.environment = self.globals
+        self.return_value = None
+        self.init_globals()
 
     def visit_literal_expr(self, expr):
         # Evaluate a literal expression (e.g., numbers, strings, booleans)
@@ -55,7 +82,7 @@ class Interpreter(Expr.ExprVisitor, Stmt.StmtVisitor):
     def visit_logical_expr(self, expr):
         # Evaluate a logical expression (AND, OR)
         left = self.evaluate(expr.left)
-        if expr.operator.type is TokenType.OR:
+        if expr.operator.type == TokenType.OR:
             if self.is_truthy(left):
                 return left
         else:
@@ -74,11 +101,10 @@ class Interpreter(Expr.ExprVisitor, Stmt.StmtVisitor):
 
     def visit_super_expr(self, expr):
         # Evaluate a super expression to access superclass methods
-        distance = self.locals.get(expr)
-        if distance is None:
+        if expr.depth is None:
             raise RuntimeError("Unresolved variable 'super'.")
-        super_class = self.environment.get_at(distance, "super")
-        object = self.environment.get_at(distance - 1, "this")
+        super_class = self.environment.get_at(expr.depth, expr.slot)
+        object = self.environment.get_at(expr.depth - 1, 0)
         method = super_class.find_method(expr.method.lexeme)
         if method is None:
             raise RuntimeError(f"Undefined property '{expr.method.lexeme}'.")
@@ -92,16 +118,34 @@ class Interpreter(Expr.ExprVisitor, Stmt.StmtVisitor):
         # Evaluate a grouping expression (parentheses)
         return self.evaluate(expr.expr)
 
+    def visit_list_expr(self, expr):
+        # Evaluate a list literal into a new list
+        return LoxList([self.evaluate(element) for element in expr.elements])
+
+    def visit_index_expr(self, expr):
+        # Evaluate an index expression to read a list element
+        object = self.evaluate(expr.object)
+        if type(object) is not LoxList:
+            raise RuntimeError("Only lists can be indexed.")
+        return object.get(self.evaluate(expr.index))
+
+    def visit_indexset_expr(self, expr):
+        # Evaluate an index set expression to assign a list element
+        object = self.evaluate(expr.object)
+        if type(object) is not LoxList:
+            raise RuntimeError("Only lists can be indexed.")
+        index = self.evaluate(expr.index)
+        value = self.evaluate(expr.value)
+        object.set(index, value)
+        return value
+
     def visit_unary_expr(self, expr):
         # Evaluate a unary expression (e.g., negation, logical NOT)
         right = self.evaluate(expr.right)
-
-        if expr.operator.type == TokenType.MINUS:
-            self.check_num_operand(right)
-            return -float(right)
-        elif expr.operator.type == TokenType.BANG:
-            return not self.is_truthy(right)
-        return None
+        operator = UNARY_OPERATORS.get(expr.operator.type)
+        if operator is None:
+            return None
+        return operator(right)
 
     def visit_variable_expr(self, expr):
         # Evaluate a variable expression to get its value
@@ -109,51 +153,44 @@ class Interpreter(Expr.ExprVisitor, Stmt.StmtVisitor):
 
     def look_up_variable(self, name, expr):
         # Look up a variable in the current or global environment
-        distance = self.locals.get(expr)
-        if distance is not None:
-            return self.environment.get_at(distance, name.lexeme)
+        if expr.depth is not None:
+            return self.environment.get_at(expr.depth, expr.slot)
         else:
             return self.globals.get(name)
 
     def visit_binary_expr(self, expr):
-        # Evaluate a binary expression (e.g., addition, subtraction, comparison)
+        # Evaluate a binary expression (e.g., addition, subtraction, comparison) through the operator table
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
-
-        if expr.operator.type == TokenType.MINUS:
-            self.check_num_operands(left, right)
-            return float(left) - float(right) if isinstance(left, float) or isinstance(right, float) else int(left) - int(right)
-        elif expr.operator.type in {TokenType.GREATER, TokenType.GREATER_EQUAL,
-                                    TokenType.LESS, TokenType.LESS_EQUAL}:
-            self.check_num_operands(left, right)
-            return eval(f'{left} {expr.operator.lexeme} {right}')
-        elif expr.operator.type in {TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL}:
-            return (left == right) if expr.operator.type == TokenType.EQUAL_EQUAL else (left != right)
-        elif expr.operator.type == TokenType.PLUS:
-            if isinstance(left, (float, int)) and isinstance(right, (float, int)):
-                return float(left) + float(right) if isinstance(left, float) or isinstance(right, float) else int(left) + int(right)
-            elif isinstance(left, str) or isinstance(right, str):
-                if isinstance(left, (int, float)):
-                    left = str(left)
-                if isinstance(right, (int, float)):
-                    right = str(right)
-                return left + right
-            else:
-                raise RuntimeError("Operands must be two numbers or two strings.")
-        elif expr.operator.type == TokenType.SLASH:
-            self.check_num_operands(left, right)
-            if right == 0.0:
-                raise RuntimeError("Division by 0 is not allowed.")
-            return float(left) / float(right)
-        elif expr.operator.type == TokenType.STAR:
-            self.check_num_operands(left, right)
-            return float(left) * float(right) if isinstance(left, float) or isinstance(right, float) else int(left) * int(right)
-        return None
+        operator = BINARY_OPERATORS.get(expr.operator.type)
+        if operator is None:
+            return None
+        return operator(left, right)
 
     def visit_call_expr(self, expr):
-        # Evaluate a function call expression
-        callee = self.evaluate(expr.callee)
+        # Evaluate a function call expression; method calls on instances skip creating a bound method
+        if isinstance(expr.callee, Expr.Get):
+            object = self.evaluate(expr.callee.object)
+            if isinstance(object, LoxInstance) and expr.callee.name.lexeme not in object.fields:
+                method = self.find_method(expr.callee, object)
+                arguments = [self.evaluate(argument) for argument in expr.arguments]
+                if len(arguments) != method.arity():
+                    raise RuntimeError(
+                        f"Expected {method.arity()} arguments but got {len(arguments)}."
+                    )
+                return method.invoke(self, object, arguments)
+            callee = self.get_property(expr.callee, object)
+        else:
+            callee = self.evaluate(expr.callee)
         arguments = [self.evaluate(argument) for argument in expr.arguments]
+        return self.call(callee, arguments)
+
+    def call(self, callee, arguments):
+        # Call a callable value after checking its arity. Native functions are called directly
+        if type(callee) is NativeFunction:
+            if len(arguments) != callee.param_count:
+                raise RuntimeError(f"Expected {callee.param_count} arguments but got {len(arguments)}.")
+            return callee.function(*arguments)
         if not isinstance(callee, LoxCallable):
             raise RuntimeError("Can only call functions and classes.")
         function = callee
@@ -165,22 +202,33 @@ class Interpreter(Expr.ExprVisitor, Stmt.StmtVisitor):
 
     def visit_get_expr(self, expr):
         # Evaluate a get expression to access an object's property
-        object = self.evaluate(expr.object)
+        return self.get_property(expr, self.evaluate(expr.object))
+
+    def get_property(self, expr, object):
+        # Read the property named by a get expression from an already evaluated object
         if isinstance(object, LoxInstance):
-            return object.get(expr.name)
+            if expr.name.lexeme in object.fields:
+                return object.fields[expr.name.lexeme]
+            if self.stats is not None:
+                self.stats.binds += 1
+                self.stats.environments += 1
+            return self.find_method(expr, object).bind(object)
         raise RuntimeError("Only instances have properties.")
 
-    def check_num_operand(self, operand):
-        # Check if a single operand is a number
-        if isinstance(operand, (int, float)):
-            return
-        raise RuntimeError("Operand must be a number.")
-
-    def check_num_operands(self, *operands):
-        # Check if all operands are numbers
-        for operand in operands:
-            if not isinstance(operand, (int, float)):
-                raise RuntimeError("Operands must be numbers.")
+    def find_method(self, expr, instance):
+        # Find the method named by a get expression using the inline cache on the node; the cache is
+        # keyed by class identity, so redefining a class (which creates a new LoxClass) invalidates it.
+        # The class and method are stored and read as one tuple, so a Program's tree shared by several
+        # interpreters or threads never pairs one interpreter's class with another's method
+        klass = instance.klass
+        cached_class, cached_method = expr.cached
+        if cached_class is klass:
+            return cached_method
+        method = klass.find_method(expr.name.lexeme)
+        if method is None:
+            raise RuntimeError("Undefined property '" + expr.name.lexeme + "'.")
+        expr.cached = (klass, method)
+        return method
 
     def is_equal(self, a, b):
         # Check if two values are equal
@@ -206,25 +254,26 @@ class Interpreter(Expr.ExprVisitor, Stmt.StmtVisitor):
         return None
 
     def visit_if_stmt(self, stmt):
-        # Execute an if statement
+        # Execute an if statement, passing on the completion signal of the branch taken
         if self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.then_branch)
+            return self.execute(stmt.then_branch)
         elif stmt.else_branch is not None:
-            self.execute(stmt.else_branch)
+            return self.execute(stmt.else_branch)
         return None
 
     def visit_print_stmt(self, stmt):
         # Execute a print statement to output a value
         value = self.evaluate(stmt.expr)
-        print(self.stringify(value))
+        self.output.write_line(stringify(value))
         return None
 
     def visit_return_stmt(self, stmt):
-        # Execute a return statement to return a value from a function
+        # Execute a return statement: record the value and signal the enclosing function to return
         value = None
         if stmt.value is not None:
             value = self.evaluate(stmt.value)
-        raise LoxReturn(value)
+        self.return_value = value
+        return RETURN
 
     def visit_var_stmt(self, stmt):
         # Execute a variable declaration statement
@@ -235,17 +284,17 @@ class Interpreter(Expr.ExprVisitor, Stmt.StmtVisitor):
         return None
 
     def visit_while_stmt(self, stmt):
-        # Execute a while statement
+        # Execute a while statement, stopping early when the body returns
         while self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+            if self.execute(stmt.body) is RETURN:
+                return RETURN
         return None
 
     def visit_assign_expr(self, expr):
         # Evaluate an assignment expression to assign a value to a variable
         value = self.evaluate(expr.value)
-        distance = self.locals.get(expr)
-        if distance is not None:
-            self.environment.assign_at(distance, expr.name, value)
+        if expr.depth is not None:
+            self.environment.assign_at(expr.depth, expr.slot, value)
         else:
             self.globals.assign(expr.name, value)
         return value
@@ -264,36 +313,52 @@ class Interpreter(Expr.ExprVisitor, Stmt.StmtVisitor):
             return bool(obj)
         return True
 
-    def interpret(self, statements):
-        # Interpret and execute a list of statements
-        try:
+    def interpret(self, statements, compile_closures=False):
+        # Interpret and execute a list of statements, optionally compiling them to Python closures first
+        if compile_closures:
+            self.run_code(ClosureCompiler(self).compile(statements))
+            return
+
+        def code(environment):
             for statement in statements:
                 self.execute(statement)
+        self.run_code(code)
+
+    def run_code(self, code):
+        # Run code(environment) in the current environment with the profiler and stats enabled, e.g. a
+        # closure from ClosureCompiler.compile(), and flush the printed output once it finishes
+        if self.profiler is not None:
+            self.profiler.start()
+        if self.stats is not None:
+            self.stats.attach(self)
+        try:
+            code(self.environment)
         except RuntimeError as error:
             raise error
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+            self.output.flush()
 
     def execute(self, stmt):
-        # Execute a statement by accepting it
-        stmt.accept(self)
-
-    def resolve(self, expr, depth):
-        # Resolve a variable by storing its scope distance
-        self.locals[expr] = depth
+        # Execute a statement by accepting it and return its completion signal (None or RETURN)
+        return stmt.accept(self)
 
     def execute_block(self, stmts, environment):
-        # Execute a block of statements within a new environment
+        # Execute a block of statements within a new environment, stopping at a return
         previous = self.environment
         try:
             self.environment = environment
             for stmt in stmts:
-                self.execute(stmt)
+                if stmt.accept(self) is RETURN:
+                    return RETURN
         finally:
             self.environment = previous
+        return None
 
     def visit_block_stmt(self, stmt):
         # Execute a block statement
-        self.execute_block(stmt.stmts, Environment(self.environment))
-        return None
+        return self.execute_block(stmt.stmts, Environment(self.environment))
 
     def visit_class_stmt(self, stmt):
         # Execute a class statement to define a class
@@ -302,8 +367,9 @@ class Interpreter(Expr.ExprVisitor, Stmt.StmtVisitor):
             super_class = self.evaluate(stmt.super_class)
             if not isinstance(super_class, LoxClass):
                 raise RuntimeError("Superclass must be a class.")
-        self.environment.define(stmt.name.lexeme, None)
         if stmt.super_class is not None:
+            if self.stats is not None:
+                self.stats.environments += 1
             self.environment = Environment(self.environment)
             self.environment.define("super", super_class)
         methods = {}
@@ -311,18 +377,9 @@ class Interpreter(Expr.ExprVisitor, Stmt.StmtVisitor):
             function = LoxFunction(method, self.environment, method.name.lexeme == "init")
             methods.update({method.name.lexeme: function})
         klass = LoxClass(stmt.name.lexeme, super_class, methods)
+        if self.profiler is not None:
+            self.profiler.define_class(stmt.name.lexeme, methods)
         if super_class is not None:
             self.environment = self.environment.enclosing
-        self.environment.assign(stmt.name, klass)
+        self.environment.define(stmt.name.lexeme, klass)
         return None
-
-    def stringify(self, obj):
-        # Convert a value to a string representation
-        if obj is None:
-            return "nil"
-        if isinstance(obj, float):
-            text = str(obj)
-            if text.endswith(".0"):
-                text = text[:-2]
-            return text
-        return str(obj)
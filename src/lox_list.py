@@ -0,0 +1,36 @@
+from reprlib import recursive_repr
+
+from lox_values import stringify
+
+
+# Lox list value, backed by a Python list so indexing, assignment and appending take constant time.
+# Lists are compared by identity, like instances
+class LoxList:
+    __slots__ = ('elements',)
+
+    def __init__(self, elements):
+        # Initialize the list with a Python list of Lox values, which it takes ownership of
+        self.elements = elements
+
+    @recursive_repr("[...]")
+    def __str__(self):
+        # Return the elements as print shows them, in brackets; a list inside itself prints as [...]
+        return "[" + ", ".join(stringify(element) for element in self.elements) + "]"
+
+    def position(self, index):
+        # Return index as a position in the list, checking that it is an integer within range
+        if type(index) is not int:
+            if not isinstance(index, float) or not index.is_integer():
+                raise RuntimeError("List index must be an integer.")
+            index = int(index)
+        if not 0 <= index < len(self.elements):
+            raise RuntimeError("List index out of range.")
+        return index
+
+    def get(self, index):
+        # Get the element at an index
+        return self.elements[self.position(index)]
+
+    def set(self, index, value):
+        # Set the element at an index
+        self.elements[self.position(index)] = value
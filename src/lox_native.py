@@ -0,0 +1,62 @@
+import inspect
+
+from lox_callable import LoxCallable
+
+
+# A Python function callable from Lox. Its arity is worked out once when it is created, and the
+# interpreter, the closure compiler and the VM recognise the type exactly and call the Python function
+# directly with the Lox arguments, skipping the LoxCallable protocol. The function receives Lox values
+# only and should raise RuntimeError for errors the Lox program is to see
+class NativeFunction(LoxCallable):
+    __slots__ = ('function', 'name', 'param_count')
+
+    def __init__(self, function, name=None, arity=None):
+        # Wrap function, named name in Lox (its Python name by default). Unless arity is given, the
+        # function takes as many arguments as it has parameters
+        self.function = function
+        self.name = name or function.__name__
+        self.param_count = len(inspect.signature(function).parameters) if arity is None else arity
+
+    def call(self, interpreter, arguments):
+        # Call the Python function with the arguments
+        return self.function(*arguments)
+
+    def arity(self):
+        # Return the precomputed number of arguments the function expects
+        return self.param_count
+
+    def __str__(self):
+        # Return the string representation of the native function
+        return f"<native fn '{self.name}'>"
+
+
+# A set of native functions collected with the native decorator, to be defined as globals of an
+# interpreter:
+#
+#     registry = NativeRegistry()
+#
+#     @registry.native()
+#     def double(x):
+#         return x * 2
+#
+#     registry.install(interpreter)
+#
+# The decorator returns the Python function unchanged, so it can still be called from Python
+class NativeRegistry:
+    def __init__(self):
+        # Initialize an empty registry
+        self.natives = {}
+
+    def native(self, name=None, arity=None):
+        # Return a decorator registering a Python function as the native named name (its Python name
+        # by default); arity overrides the number of parameters
+        def register(function):
+            native = NativeFunction(function, name, arity)
+            self.natives[native.name] = native
+            return function
+        return register
+
+    def install(self, interpreter):
+        # Define every registered native in the interpreter's globals, where they stay across resets
+        for name, native in self.natives.items():
+            interpreter.define_native(name, native)
@@ -0,0 +1,124 @@
+from token_type import TokenType
+
+
+# Implementations of the Lox operators shared by the execution engines. Integer operands stay
+# integers, any float operand promotes the result to a float, and division always yields a float
+
+
+def check_num_operand(operand):
+    # Check if a single operand is a number
+    if isinstance(operand, (int, float)):
+        return
+    raise RuntimeError("Operand must be a number.")
+
+
+def check_num_operands(left, right):
+    # Check if both operands are numbers
+    if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+        raise RuntimeError("Operands must be numbers.")
+
+
+def add(left, right):
+    # Add two numbers, or concatenate when either operand is a string and the other is a string or a
+    # number; any other operand, such as nil or an instance, is an error
+    if isinstance(left, (float, int)) and isinstance(right, (float, int)):
+        if isinstance(left, float) or isinstance(right, float):
+            return float(left) + float(right)
+        return int(left) + int(right)
+    if isinstance(left, str) or isinstance(right, str):
+        if isinstance(left, (int, float)):
+            left = str(left)
+        if isinstance(right, (int, float)):
+            right = str(right)
+        if isinstance(left, str) and isinstance(right, str):
+            return left + right
+    raise RuntimeError("Operands must be two numbers or two strings.")
+
+
+def subtract(left, right):
+    # Subtract two numbers
+    check_num_operands(left, right)
+    if isinstance(left, float) or isinstance(right, float):
+        return float(left) - float(right)
+    return int(left) - int(right)
+
+
+def multiply(left, right):
+    # Multiply two numbers
+    check_num_operands(left, right)
+    if isinstance(left, float) or isinstance(right, float):
+        return float(left) * float(right)
+    return int(left) * int(right)
+
+
+def divide(left, right):
+    # Divide two numbers, rejecting division by zero
+    check_num_operands(left, right)
+    if right == 0.0:
+        raise RuntimeError("Division by 0 is not allowed.")
+    return float(left) / float(right)
+
+
+def greater(left, right):
+    # Compare two numbers with >
+    check_num_operands(left, right)
+    return left > right
+
+
+def greater_equal(left, right):
+    # Compare two numbers with >=
+    check_num_operands(left, right)
+    return left >= right
+
+
+def less(left, right):
+    # Compare two numbers with <
+    check_num_operands(left, right)
+    return left < right
+
+
+def less_equal(left, right):
+    # Compare two numbers with <=
+    check_num_operands(left, right)
+    return left <= right
+
+
+def equal(left, right):
+    # Check two values for equality
+    return left == right
+
+
+def not_equal(left, right):
+    # Check two values for inequality
+    return left != right
+
+
+def negate(right):
+    # Negate a number
+    check_num_operand(right)
+    return -float(right)
+
+
+def logical_not(right):
+    # Return the logical negation of a value's truthiness
+    return right is None or right is False
+
+
+# Operator implementations keyed by the token type of the operator
+BINARY_OPERATORS = {
+    TokenType.PLUS: add,
+    TokenType.MINUS: subtract,
+    TokenType.STAR: multiply,
+    TokenType.SLASH: divide,
+    TokenType.GREATER: greater,
+    TokenType.GREATER_EQUAL: greater_equal,
+    TokenType.LESS: less,
+    TokenType.LESS_EQUAL: less_equal,
+    TokenType.EQUAL_EQUAL: equal,
+    TokenType.BANG_EQUAL: not_equal,
+}
+
+UNARY_OPERATORS = {
+    TokenType.MINUS: negate,
+    TokenType.BANG: logical_not,
+}
@@ -0,0 +1,216 @@
+import Expr
+import Stmt
+from token_type import TokenType
+from lox_operators import BINARY_OPERATORS, UNARY_OPERATORS
+
+
+# Optimization pass run on resolved statements before they are executed. It folds operators whose
+# operands are all literals into a single Expr.Literal, using the runtime operator implementations so
+# int/float promotion and string concatenation behave exactly as when the program runs, and removes
+# if branches and while loops whose literal condition means they can never run. Each visit method
+# returns the node that replaces the visited one (None to remove a statement)
+class Optimizer(Expr.ExprVisitor, Stmt.StmtVisitor):
+    def __init__(self):
+        # Running totals over every program optimized by this instance
+        self.folded = 0
+        self.eliminated = 0
+
+    def optimize(self, statements):
+        # Optimize a list of resolved statements and return the optimized list
+        return self.optimize_stmts(statements)
+
+    def report(self):
+        # Summarize how much the pass has simplified so far
+        return f"folded {self.folded} expressions, eliminated {self.eliminated} statements"
+
+    def optimize_stmts(self, stmts):
+        # Optimize each statement in a list, dropping the ones that were eliminated
+        optimized = []
+        for stmt in stmts:
+            stmt = stmt.accept(self)
+            if stmt is not None:
+                optimized.append(stmt)
+        return optimized
+
+    def optimize_branch(self, stmt):
+        # Optimize the body of an if or while statement, which must stay a statement even when empty
+        stmt = stmt.accept(self)
+        if stmt is None:
+            return Stmt.Block([])
+        return stmt
+
+    def is_truthy(self, value):
+        # Determine if a literal value is truthy
+        return value is not None and value is not False
+
+    def fold(self, value):
+        # Replace a constant subtree with a literal holding its value
+        self.folded += 1
+        return Expr.Literal(value)
+
+    def visit_assign_expr(self, expr):
+        # Optimize the assigned value
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_binary_expr(self, expr):
+        # Fold a binary operator applied to two literals; operands the operator rejects are left for the
+        # program to report at runtime, so folding never fails even in code that never runs
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+        operator = BINARY_OPERATORS.get(expr.operator.type)
+        if operator is None or not isinstance(expr.left, Expr.Literal) or not isinstance(expr.right, Expr.Literal):
+            return expr
+        try:
+            value = operator(expr.left.value, expr.right.value)
+        except Exception:
+            return expr
+        return self.fold(value)
+
+    def visit_call_expr(self, expr):
+        # Optimize the callee and the arguments
+        expr.callee = expr.callee.accept(self)
+        expr.arguments = [argument.accept(self) for argument in expr.arguments]
+        return expr
+
+    def visit_get_expr(self, expr):
+        # Optimize the object whose property is read
+        expr.object = expr.object.accept(self)
+        return expr
+
+    def visit_grouping_expr(self, expr):
+        # Parentheses only matter to the parser, so a grouping is replaced by its optimized contents
+        inner = expr.expr.accept(self)
+        if isinstance(inner, Expr.Literal):
+            self.folded += 1
+        return inner
+
+    def visit_index_expr(self, expr):
+        # Optimize the indexed object and the index
+        expr.object = expr.object.accept(self)
+        expr.index = expr.index.accept(self)
+        return expr
+
+    def visit_indexset_expr(self, expr):
+        # Optimize the indexed object, the index and the assigned value
+        expr.object = expr.object.accept(self)
+        expr.index = expr.index.accept(self)
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_list_expr(self, expr):
+        # Optimize the elements of a list literal, which builds a new list every time it runs
+        expr.elements = [element.accept(self) for element in expr.elements]
+        return expr
+
+    def visit_literal_expr(self, expr):
+        # A literal is already constant
+        return expr
+
+    def visit_logical_expr(self, expr):
+        # A literal left operand decides whether the logical expression yields it or its right operand
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+        if not isinstance(expr.left, Expr.Literal):
+            return expr
+        self.folded += 1
+        if self.is_truthy(expr.left.value) == (expr.operator.type == TokenType.OR):
+            return expr.left
+        return expr.right
+
+    def visit_set_expr(self, expr):
+        # Optimize the object and the assigned value
+        expr.object = expr.object.accept(self)
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_super_expr(self, expr):
+        # Nothing to optimize in a superclass method access
+        return expr
+
+    def visit_this_expr(self, expr):
+        # Nothing to optimize in 'this'
+        return expr
+
+    def visit_unary_expr(self, expr):
+        # Fold a unary operator applied to a literal, leaving operands the operator rejects for runtime
+        expr.right = expr.right.accept(self)
+        operator = UNARY_OPERATORS.get(expr.operator.type)
+        if operator is None or not isinstance(expr.right, Expr.Literal):
+            return expr
+        try:
+            value = operator(expr.right.value)
+        except Exception:
+            return expr
+        return self.fold(value)
+
+    def visit_variable_expr(self, expr):
+        # Nothing to optimize in a variable read
+        return expr
+
+    def visit_block_stmt(self, stmt):
+        # Optimize the statements of a block
+        stmt.stmts = self.optimize_stmts(stmt.stmts)
+        return stmt
+
+    def visit_class_stmt(self, stmt):
+        # Optimize the bodies of the class's methods
+        for method in stmt.methods:
+            method.accept(self)
+        return stmt
+
+    def visit_expression_stmt(self, stmt):
+        # Optimize the expression of an expression statement
+        stmt.expr = stmt.expr.accept(self)
+        return stmt
+
+    def visit_function_stmt(self, stmt):
+        # Optimize the body of a function
+        stmt.body = self.optimize_stmts(stmt.body)
+        return stmt
+
+    def visit_if_stmt(self, stmt):
+        # Keep only the branch a literal condition selects, or drop the statement if there is none
+        stmt.condition = stmt.condition.accept(self)
+        if isinstance(stmt.condition, Expr.Literal):
+            self.eliminated += 1
+            if self.is_truthy(stmt.condition.value):
+                return stmt.then_branch.accept(self)
+            if stmt.else_branch is not None:
+                return stmt.else_branch.accept(self)
+            return None
+        stmt.then_branch = self.optimize_branch(stmt.then_branch)
+        if stmt.else_branch is not None:
+            stmt.else_branch = stmt.else_branch.accept(self)
+        return stmt
+
+    def visit_print_stmt(self, stmt):
+        # Optimize the printed expression
+        stmt.expr = stmt.expr.accept(self)
+        return stmt
+
+    def visit_return_stmt(self, stmt):
+        # Optimize the returned expression
+        if stmt.value is not None:
+            stmt.value = stmt.value.accept(self)
+        return stmt
+
+    def visit_var_stmt(self, stmt):
+        # Optimize the initializer of a variable declaration
+        if stmt.initializer is not None:
+            stmt.initializer = stmt.initializer.accept(self)
+        return stmt
+
+    def visit_while_stmt(self, stmt):
+        # Drop a loop whose literal condition is false, since its body can never run
+        stmt.condition = stmt.condition.accept(self)
+        if isinstance(stmt.condition, Expr.Literal) and not self.is_truthy(stmt.condition.value):
+            self.eliminated += 1
+            return None
+        stmt.body = self.optimize_branch(stmt.body)
+        return stmt
+
+    def visit_input_stmt(self, stmt):
+        # Optimize the prompt of an input statement
+        stmt.expression = stmt.expression.accept(self)
+        return stmt
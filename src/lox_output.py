@@ -0,0 +1,36 @@
+import sys
+
+
+# Buffered sink for the output of print statements. Lines are collected in memory and written to the
+# stream in one call when enough are pending or when flush is called, which the engines do when a
+# program ends or fails and before input is read. The stream defaults to whatever sys.stdout is at
+# the time of writing, so redirecting sys.stdout keeps working
+class OutputBuffer:
+    __slots__ = ('stream', 'pending', 'max_pending')
+
+    def __init__(self, stream=None, max_pending=4096):
+        # Initialize the buffer for a text stream, writing it out whenever max_pending lines are waiting
+        self.stream = stream
+        self.pending = []
+        self.max_pending = max_pending
+
+    def write_line(self, text):
+        # Queue one line of output
+        pending = self.pending
+        pending.append(text)
+        if len(pending) >= self.max_pending:
+            self.write_pending()
+
+    def write_pending(self):
+        # Write the queued lines to the stream without flushing the stream itself
+        if self.pending:
+            stream = self.stream if self.stream is not None else sys.stdout
+            self.pending.append("")
+            stream.write("\n".join(self.pending))
+            self.pending = []
+
+    def flush(self):
+        # Write the queued lines and flush the stream, so the output is visible before anything else happens
+        self.write_pending()
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.flush()
@@ -10,9 +10,12 @@ class ParseError(RuntimeError):
 
 class Parser:
     def __init__(self, tokens):
-        # Initialize the parser with a list of tokens and set the current position to 0
-        self.current = 0
-        self.tokens = tokens
+        # Initialize the parser with a list or an iterator of tokens ending in EOF. Only the current
+        # token and the one before it are kept, so tokens can be scanned on demand
+        self.tokens = iter(tokens)
+        self.current_token = next(self.tokens)
+        self.previous_token = None
+        self.first_error = None
 
     # Entry point for parsing expressions
     def expression(self):
@@ -28,7 +31,11 @@ class Parser:
             if self.match(TokenType.CLASS):
                 return self.class_declaration()
             return self.statement()
-        except ParseError:
+        except ParseError as error:
+            # Skip to the next statement so the rest of the input is still checked; the first error is
+            # raised once parsing is done
+            if self.first_error is None:
+                self.first_error = error
             self.synchronize()
             return None
 
@@ -55,37 +62,38 @@ class Parser:
             expr = Expr.Binary(expr, operator, right)
         return expr
 
-    # Check if the next token matches one of the given types
+    # Check if the next token matches one of the given types, consuming it if so. Token types are
+    # integers, so this is a single tuple membership test; EOF is never passed in, so the current
+    # token matching means the parser is not at the end
     def match(self, *types):
-        for type in types:
-            if self.check(type):
-                self.advance()
-                return True
+        if self.current_token.type in types:
+            self.advance()
+            return True
         return False
 
     # Check if the current token matches the given type
     def check(self, type):
-        if self.is_at_end():
-            return False
-        return self.peek().type == type
+        token_type = self.current_token.type
+        return token_type == type and token_type != TokenType.EOF
 
     # Advance to the next token
     def advance(self):
         if not self.is_at_end():
-            self.current += 1
+            self.previous_token = self.current_token
+            self.current_token = next(self.tokens)
         return self.previous()
 
     # Check if the current token is the end of file
     def is_at_end(self):
-        return self.peek().type == TokenType.EOF
+        return self.current_token.type == TokenType.EOF
 
     # Return the current token
     def peek(self):
-        return self.tokens[self.current]
+        return self.current_token
 
     # Return the previous token
     def previous(self):
-        return self.tokens[self.current - 1]
+        return self.previous_token
 
     # Parse a comparison expression
     def comparison(self):
@@ -134,7 +142,7 @@ class Parser:
         paren = self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
         return Expr.Call(callee, paren, arguments)
 
-    # Parse a function call or property access
+    # Parse a function call, property access or list index
     def call(self):
         expr = self.primary()
         while True:
@@ -143,11 +151,16 @@ class Parser:
             elif self.match(TokenType.DOT):
                 name = self.consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
                 expr = Expr.Get(expr, name)
+            elif self.match(TokenType.LEFT_BRACKET):
+                bracket = self.previous()
+                index = self.expression()
+                self.consume(TokenType.RIGHT_BRACKET, "Expect ']' after index.")
+                expr = Expr.Index(expr, bracket, index)
             else:
                 break
         return expr
 
-    # Parse a primary expression (literals, identifiers, grouping)
+    # Parse a primary expression (literals, identifiers, grouping, list literals)
     def primary(self):
         if self.match(TokenType.FALSE):
             return Expr.Literal(False)
@@ -170,8 +183,21 @@ class Parser:
             expr = self.expression()
             self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
             return Expr.Grouping(expr)
+        elif self.match(TokenType.LEFT_BRACKET):
+            return self.list_literal()
         raise ParseError("Expect expression.")
 
+    # Parse the elements of a list literal after its opening bracket
+    def list_literal(self):
+        bracket = self.previous()
+        elements = []
+        if not self.check(TokenType.RIGHT_BRACKET):
+            elements.append(self.expression())
+            while self.match(TokenType.COMMA):
+                elements.append(self.expression())
+        self.consume(TokenType.RIGHT_BRACKET, "Expect ']' after list elements.")
+        return Expr.List(bracket, elements)
+
     # Consume the current token if it matches the given type, otherwise raise an error
     def consume(self, type, message):
         if self.check(type):
@@ -193,13 +219,15 @@ class Parser:
                 return
             self.advance()
 
-    # Parse the list of statements in the source code
+    # Parse the list of statements in the source code, raising the first parse error if there was one
     def parse(self):
         statements = []
         while not self.is_at_end():
             stmt = self.declaration()
             if stmt is not None:
                 statements.append(stmt)
+        if self.first_error is not None:
+            raise self.first_error
         return statements
 
     # Parse a single statement
@@ -340,6 +368,8 @@ class Parser:
                 return Expr.Assign(expr.name, value)
             elif isinstance(expr, Expr.Get):
                 return Expr.Set(expr.object, expr.name, value)
+            elif isinstance(expr, Expr.Index):
+                return Expr.IndexSet(expr.object, expr.bracket, expr.index, value)
             raise ParseError("Invalid assignment target.")
         return expr
 
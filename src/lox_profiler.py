@@ -0,0 +1,142 @@
+import signal
+from time import perf_counter
+
+import Expr
+import Stmt
+
+# Token attribute holding the source line of each node type that has one
+LINE_TOKENS = {
+    Expr.Assign: "name",
+    Expr.Binary: "operator",
+    Expr.Call: "paren",
+    Expr.Get: "name",
+    Expr.Index: "bracket",
+    Expr.IndexSet: "bracket",
+    Expr.List: "bracket",
+    Expr.Logical: "operator",
+    Expr.Set: "name",
+    Expr.Super: "keyword",
+    Expr.This: "keyword",
+    Expr.Unary: "operator",
+    Expr.Variable: "name",
+    Stmt.Class: "name",
+    Stmt.Function: "name",
+    Stmt.Input: "name",
+    Stmt.Return: "keyword",
+    Stmt.Var: "name",
+}
+
+ROOT_FRAME = "<script>"
+
+
+def node_line(frame):
+    # Return the source line of the innermost AST node being visited by a Python frame or its callers
+    while frame is not None:
+        local_values = frame.f_locals
+        for name in ("expr", "stmt"):
+            attribute = LINE_TOKENS.get(type(local_values.get(name)))
+            if attribute is not None:
+                return getattr(local_values[name], attribute).line
+        frame = frame.f_back
+    return None
+
+
+# Opt-in profiler for the tree-walking interpreter and the closure compiler, enabled by setting
+# Interpreter.profiler. Every LoxFunction call is timed deterministically (calls, total and self time
+# per function, with methods named Class.method), while a profiling timer samples the source line being
+# executed and the Lox call stack for the per-line report and collapsed stacks. Lines are found from
+# the tree-walker's visit methods, so closure-compiled code is sampled without them. Sampling needs
+# signal.setitimer and the main thread; elsewhere only function timings are collected
+class Profiler:
+    def __init__(self, interval=0.001):
+        # Initialize the profiler with the sampling interval in seconds of CPU time
+        self.interval = interval
+        self.labels = {}
+        self.functions = {}
+        self.active = {}
+        self.stack = [ROOT_FRAME]
+        self.child_times = []
+        self.line_samples = {}
+        self.stack_samples = {}
+        self.samples = 0
+        self.previous_handler = None
+        self.sampling = False
+
+    def define_class(self, class_name, methods):
+        # Name the methods of a newly defined class after it, as Class.method
+        for method_name, method in methods.items():
+            self.labels[method.declaration] = f"{class_name}.{method_name}"
+
+    def profile_call(self, function, body, interpreter, environment):
+        # Run body(interpreter, environment) for a function call, recording its time and call count.
+        # Time spent in recursive calls of a function still on the stack is not counted twice in its total
+        label = self.labels.get(function.declaration)
+        if label is None:
+            label = self.labels[function.declaration] = function.declaration.name.lexeme
+        stack = self.stack
+        child_times = self.child_times
+        active = self.active
+        stack.append(label)
+        child_times.append(0.0)
+        active[label] = active.get(label, 0) + 1
+        start = perf_counter()
+        try:
+            return body(interpreter, environment)
+        finally:
+            elapsed = perf_counter() - start
+            children = child_times.pop()
+            stack.pop()
+            if child_times:
+                child_times[-1] += elapsed
+            stats = self.functions.get(label)
+            if stats is None:
+                stats = self.functions[label] = [0, 0.0, 0.0]
+            stats[0] += 1
+            stats[2] += elapsed - children
+            active[label] -= 1
+            if not active[label]:
+                stats[1] += elapsed
+
+    def sample(self, signum, frame):
+        # Timer signal handler recording the current source line and Lox call stack
+        self.samples += 1
+        line = node_line(frame)
+        key = ";".join(self.stack)
+        if line is not None:
+            self.line_samples[line] = self.line_samples.get(line, 0) + 1
+            key += f";line {line}"
+        self.stack_samples[key] = self.stack_samples.get(key, 0) + 1
+
+    def start(self):
+        # Start sampling when the platform supports profiling timers in this thread
+        try:
+            self.previous_handler = signal.signal(signal.SIGPROF, self.sample)
+        except (AttributeError, ValueError):
+            return
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        self.sampling = True
+
+    def stop(self):
+        # Stop sampling and restore the previous signal handler
+        if self.sampling:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self.previous_handler)
+            self.sampling = False
+
+    def report(self):
+        # Return a flat text report: functions by self time, then sampled source lines by sample count
+        out = [f"{'function':<32} {'calls':>10} {'total s':>10} {'self s':>10}"]
+        for label, (calls, total, self_time) in sorted(self.functions.items(), key=lambda item: -item[1][2]):
+            out.append(f"{label:<32} {calls:>10} {total:>10.4f} {self_time:>10.4f}")
+        out.append("")
+        out.append(f"{'line':<8} {'samples':>10} {'approx s':>10} {'percent':>8}")
+        for line, count in sorted(self.line_samples.items(), key=lambda item: -item[1]):
+            out.append(f"{line:<8} {count:>10} {count * self.interval:>10.4f} "
+                       f"{100.0 * count / self.samples:>7.1f}%")
+        return "\n".join(out)
+
+    def write_collapsed(self, file):
+        # Write the sampled stacks in collapsed format ("frame;frame;line N count" per line), the input
+        # of flamegraph.pl and speedscope
+        for key, count in sorted(self.stack_samples.items()):
+            file.write(f"{key} {count}\n")
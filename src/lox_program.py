@@ -0,0 +1,58 @@
+from scanner import RegexScanner
+from lox_parser import Parser
+from lox_resolver import Resolver
+from lox_optimizer import Optimizer
+from lox_closure_compiler import ClosureCompiler
+from lox_compiler import Compiler
+from lox_vm import VM
+
+
+def compile(source, optimize=True):
+    # Scan, parse and resolve Lox source code once, folding constants unless optimize is False, and
+    # return it as a Program. Scan and resolve errors raise ValueError, parse errors RuntimeError
+    statements = Parser(RegexScanner(source).scan_tokens()).parse()
+    Resolver().resolve_stmts(statements)
+    if optimize:
+        statements = Optimizer().optimize(statements)
+    return Program(statements)
+
+
+# A compiled Lox program for embedding the interpreter in a host application. It can be run any number
+# of times, in one interpreter or in several, without being scanned, parsed or resolved again; the
+# closure and bytecode compilations are also done once and reused
+class Program:
+    def __init__(self, statements):
+        # Initialize the program with its resolved statements
+        self.statements = statements
+        # (interpreter, stats, code) of the last closure compilation, which binds the interpreter's
+        # globals, output and stats
+        self.closures = None
+        self.bytecode = None
+
+    def run(self, interpreter, globals=None, reset=False, use_vm=False, compile_closures=False):
+        # Run the program in interpreter, on the bytecode VM when use_vm is set or on the closure
+        # compiler when compile_closures is set. With reset, globals defined by earlier programs are
+        # forgotten first; otherwise the program shares them. globals maps names to values defined
+        # before the program starts, such as its inputs. Results are read back from
+        # interpreter.globals.values once it returns
+        if reset:
+            interpreter.reset_globals()
+        if globals:
+            interpreter.globals.values.update(globals)
+        if use_vm:
+            if self.bytecode is None:
+                self.bytecode = Compiler().compile(self.statements)
+            VM(interpreter).interpret(self.bytecode)
+        elif compile_closures:
+            interpreter.run_code(self.compiled_closures(interpreter))
+        else:
+            interpreter.interpret(self.statements)
+
+    def compiled_closures(self, interpreter):
+        # Return the closure compilation of the program for interpreter, compiling it again only when
+        # the interpreter or its stats differ from the last run
+        closures = self.closures
+        if closures is None or closures[0] is not interpreter or closures[1] is not interpreter.stats:
+            closures = self.closures = (interpreter, interpreter.stats,
+                                        ClosureCompiler(interpreter).compile(self.statements))
+        return closures[2]
@@ -0,0 +1,124 @@
+import sys
+from time import perf_counter
+
+from scanner import RegexScanner
+from lox_resolver import Resolver
+from token_type import TokenType
+
+PROMPT = "py-lox> "
+CONTINUATION_PROMPT = "....... "
+
+# Change in bracket depth for each bracket token; input is incomplete while a bracket is open
+BRACKETS = {
+    TokenType.LEFT_PAREN: 1,
+    TokenType.LEFT_BRACE: 1,
+    TokenType.LEFT_BRACKET: 1,
+    TokenType.RIGHT_PAREN: -1,
+    TokenType.RIGHT_BRACE: -1,
+    TokenType.RIGHT_BRACKET: -1,
+}
+
+
+# Interactive session of the Lox prompt. Lines are collected until they form a complete input (no open
+# string, parenthesis, brace or bracket, or a blank line ends it), which is then compiled and run on the
+# chosen engine in the session's interpreter, so globals persist from one input to the next. One
+# resolver is kept for the whole session and put back at the top level after an input fails to
+# resolve; resolution results live on the AST nodes of each input, so they are released together with
+# the input once nothing defined by it is reachable any more. The session holds no reference to
+# earlier inputs
+class ReplSession:
+    def __init__(self, lox, use_vm=False, compile_closures=False, timing=False):
+        # Initialize the session on a Lox instance. With timing set, the compile and run time of every
+        # input is printed to stderr
+        self.lox = lox
+        self.use_vm = use_vm
+        self.compile_closures = compile_closures
+        self.timing = timing
+        self.resolver = Resolver()
+        self.pending = []
+        self.inputs = 0
+        self.last_timing = None
+
+    def is_complete(self, source):
+        # Check if source can run as it is, i.e. it does not end inside a string or an open bracket.
+        # Other scan errors count as complete so they are reported right away
+        try:
+            tokens = RegexScanner(source).scan_tokens()
+        except ValueError as error:
+            return str(error) != "Unterminated string."
+        depth = 0
+        for token in tokens:
+            depth += BRACKETS.get(token.type, 0)
+        return depth <= 0
+
+    def feed(self, line):
+        # Add a line of input and run the pending lines once they are complete. Return False while
+        # more lines are needed, True once the input has been run (errors are raised to the caller)
+        self.pending.append(line)
+        source = "\n".join(self.pending)
+        if line.strip() and not self.is_complete(source):
+            return False
+        self.pending = []
+        if source.strip():
+            self.run_input(source)
+        return True
+
+    def compile(self, source):
+        # Scan, parse, resolve and optimize one input with the session's resolver
+        lox = self.lox
+        statements = lox.parse(lox.scan(source))
+        try:
+            self.resolver.resolve_stmts(statements)
+        except Exception:
+            self.resolver.reset()
+            raise
+        return lox.optimize(statements)
+
+    def run_input(self, source):
+        # Compile and run one complete input, recording (compile seconds, run seconds) in last_timing
+        start = perf_counter()
+        statements = self.compile(source)
+        compiled = perf_counter()
+        try:
+            self.lox.execute(statements, self.use_vm, self.compile_closures)
+        finally:
+            finished = perf_counter()
+            self.inputs += 1
+            self.last_timing = (compiled - start, finished - compiled)
+            if self.timing:
+                self.report_timing()
+
+    def report_timing(self):
+        # Print the compile and run time of the last input to stderr
+        compile_time, run_time = self.last_timing
+        print(f"[{self.inputs}] compile {compile_time * 1000:.3f} ms, run {run_time * 1000:.3f} ms",
+              file=sys.stderr)
+
+    def report_error(self, error):
+        # Print an input's error after any output it produced
+        sys.stdout.flush()
+        print(f"<stdin>: {error}", file=sys.stderr)
+
+    def run(self, read=input):
+        # Read lines with read(prompt) and run them until end of input. Errors are reported and the
+        # session continues; Ctrl-C discards a partly typed input or stops the running one
+        interpreter = self.lox.interpreter
+        while True:
+            try:
+                line = read(CONTINUATION_PROMPT if self.pending else PROMPT)
+            except EOFError:
+                print()
+                return
+            except KeyboardInterrupt:
+                print()
+                self.pending = []
+                continue
+            try:
+                self.feed(line)
+            except (ValueError, RuntimeError) as error:
+                self.report_error(error)
+            except KeyboardInterrupt:
+                interpreter.output.flush()
+                self.report_error("Interrupted.")
+            # An interrupt can arrive while the interpreter is inside one of its scopes
+            interpreter.environment = interpreter.globals
@@ -18,14 +18,20 @@ class ClassType(enum.Enum):
     SUBCLASS = enum.auto()
 
 
-# Resolver class to resolve variable and function scopes
+# Resolver class to resolve variable and function scopes. Each scope maps a name to a (defined, slot)
+# pair, the slot being the name's position in declaration order
 class Resolver(Expr.ExprVisitor, Stmt.StmtVisitor):
-    def __init__(self, interpreter):
-        self.interpreter = interpreter
+    def __init__(self):
         self.scopes = []
         self.current_function = FunctionType.NONE
         self.current_class = ClassType.NONE
 
+    def reset(self):
+        # Return to the top level after resolution stopped at an error partway through a program
+        self.scopes.clear()
+        self.current_function = FunctionType.NONE
+        self.current_class = ClassType.NONE
+
     def visit_block_stmt(self, stmt):
         # Resolve a block statement by creating a new scope
         self.begin_scope()
@@ -47,10 +53,10 @@ class Resolver(Expr.ExprVisitor, Stmt.StmtVisitor):
             self.current_class = ClassType.SUBCLASS
             self.resolve(stmt.super_class)
             self.begin_scope()
-            self.scopes[-1]["super"] = True
+            self.scopes[-1]["super"] = (True, 0)
 
         self.begin_scope()
-        self.scopes[-1]["this"] = True
+        self.scopes[-1]["this"] = (True, 0)
         for method in stmt.methods:
             declaration = FunctionType.METHOD
             if method.name.lexeme == "init":
@@ -142,6 +148,25 @@ class Resolver(Expr.ExprVisitor, Stmt.StmtVisitor):
         self.resolve(expr.expr)
         return None
 
+    def visit_index_expr(self, expr):
+        # Resolve an index expression (list element access)
+        self.resolve(expr.object)
+        self.resolve(expr.index)
+        return None
+
+    def visit_indexset_expr(self, expr):
+        # Resolve an index set expression (assignment to a list element)
+        self.resolve(expr.object)
+        self.resolve(expr.index)
+        self.resolve(expr.value)
+        return None
+
+    def visit_list_expr(self, expr):
+        # Resolve the elements of a list literal
+        for element in expr.elements:
+            self.resolve(element)
+        return None
+
     def visit_literal_expr(self, expr):
         # Resolve a literal expression (no action needed)
         return None
@@ -181,10 +206,8 @@ class Resolver(Expr.ExprVisitor, Stmt.StmtVisitor):
 
     def visit_variable_expr(self, expr):
         # Resolve a variable expression
-        if len(self.scopes) != 0 and self.scopes[-1].get(expr.name.lexeme) is False:
-            self.on_error(
-                expr.name, "Cannot read local variable in its own initializer."
-            )
+        if len(self.scopes) != 0 and self.scopes[-1].get(expr.name.lexeme, (True,))[0] is False:
+            raise ValueError("Cannot read local variable in its own initializer.")
         self.resolve_local(expr, expr.name)
         return None
 
@@ -231,18 +254,22 @@ class Resolver(Expr.ExprVisitor, Stmt.StmtVisitor):
         scope = self.scopes[-1]
         if name.lexeme in scope:
             raise ValueError("Already a variable with this name in this scope.")
-        scope[name.lexeme] = False
+        scope[name.lexeme] = (False, len(scope))
 
     def define(self, name):
         # Define a variable in the current scope
         if len(self.scopes) == 0:
             return
         scope = self.scopes[-1]
-        scope[name.lexeme] = True
+        scope[name.lexeme] = (True, scope[name.lexeme][1])
 
     def resolve_local(self, expr, name):
-        # Resolve a local variable in the current or enclosing scopes
+        # Annotate the expression with the scope distance of a local variable and the slot recorded when
+        # it was declared; slots follow declaration order, which is the order the interpreter defines
+        # them in. Expressions that are not found keep depth None and are looked up as globals
         for idx, scope in enumerate(reversed(self.scopes)):
-            if name.lexeme in scope:
-                self.interpreter.resolve(expr, idx)
+            entry = scope.get(name.lexeme)
+            if entry is not None:
+                expr.depth = idx
+                expr.slot = entry[1]
                 return
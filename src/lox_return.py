@@ -1,6 +1,5 @@
-# Custom exception class for handling return statements in Lox
-class LoxReturn(Exception):
-    def __init__(self, value):
-        # Initialize the return exception with a value
-        super().__init__(None)
-        self.value = value
+# Completion signal for return statements. Executing a statement normally yields None; a return
+# statement stores its value in the interpreter's return_value attribute and yields RETURN instead,
+# which enclosing blocks, ifs and loops pass straight up to the function call running the body.
+# Unlike raising an exception this allocates nothing and unwinds with ordinary returns
+RETURN = object()
@@ -0,0 +1,73 @@
+import Expr
+import Stmt
+
+# Counters bumped on every visit of a node type, beyond the node count itself: a block allocates an
+# environment, a return statement completes a function and a super expression binds a method
+VISIT_EXTRAS = {
+    "Block": ("environments",),
+    "Return": ("returns",),
+    "Super": ("binds", "environments"),
+}
+
+
+# Execution counters collected by an Interpreter whose stats attribute is set: nodes evaluated per
+# node type, environments allocated, function calls, method binds, instances created and returns.
+# Node counts come from the tree-walker only; the other counters also cover the closure compiler.
+# The bytecode VM manages its own frames and is not counted
+class ExecutionStats:
+    def __init__(self):
+        # Start every counter at zero
+        self.nodes = {}
+        self.environments = 0
+        self.calls = 0
+        self.binds = 0
+        self.instances = 0
+        self.returns = 0
+        self.attached = set()
+
+    def attach(self, interpreter):
+        # Count node visits by wrapping the interpreter's visit methods on the instance, so an
+        # interpreter without stats keeps its plain methods and pays nothing
+        if id(interpreter) in self.attached:
+            return
+        self.attached.add(id(interpreter))
+        for module, suffix in ((Expr, "_expr"), (Stmt, "_stmt")):
+            for name, value in vars(module).items():
+                if isinstance(value, type) and value.__bases__ in ((Expr.Expr,), (Stmt.Stmt,)):
+                    method_name = "visit_" + name.lower() + suffix
+                    method = getattr(interpreter, method_name, None)
+                    if method is not None:
+                        setattr(interpreter, method_name, self.counted_visit(name, method))
+
+    def counted_visit(self, key, method):
+        # Return a visit method that counts the node before visiting it
+        nodes = self.nodes
+        nodes.setdefault(key, 0)
+        extras = VISIT_EXTRAS.get(key, ())
+
+        def visit(node):
+            nodes[key] += 1
+            for counter in extras:
+                setattr(self, counter, getattr(self, counter) + 1)
+            return method(node)
+        return visit
+
+    def as_dict(self):
+        # Return the counters as a plain dictionary, leaving out node types never evaluated
+        return {
+            "nodes": {key: count for key, count in sorted(self.nodes.items()) if count},
+            "environments": self.environments,
+            "calls": self.calls,
+            "binds": self.binds,
+            "instances": self.instances,
+            "returns": self.returns,
+        }
+
+    def report(self):
+        # Return a text summary of the counters
+        counts = self.as_dict()
+        out = [f"{name:<14} {counts[name]:>12}" for name in ("environments", "calls", "binds", "instances", "returns")]
+        out.append(f"{'nodes':<14} {sum(counts['nodes'].values()):>12}")
+        for key, count in sorted(counts["nodes"].items(), key=lambda item: -item[1]):
+            out.append(f"  {key:<12} {count:>12}")
+        return "\n".join(out)
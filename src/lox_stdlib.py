@@ -0,0 +1,372 @@
+import math
+import re
+
+from lox_native import NativeRegistry
+from lox_list import LoxList
+from lox_values import stringify
+
+# Standard library defined as globals of every interpreter, next to clock and input. Each native does
+# a whole string, list or math operation in Python instead of interpreting it node by node
+STDLIB = NativeRegistry()
+
+# Largest number of characters or elements a native builds in one call, and largest integer result of
+# pow in bits. Beyond these Python would run out of memory or time, and the Lox program gets a runtime
+# error instead
+MAX_SIZE = 2 ** 28
+MAX_POW_BITS = 2 ** 22
+
+# Text number accepts: a Lox number literal with an optional sign, in ASCII digits only
+NUMBER_PATTERN = re.compile(r"[+-]?\d+(\.\d+)?", re.ASCII)
+
+
+# Mutable buffer collecting the pieces of a string, so building a long string costs time linear in
+# its length instead of copying the whole string on every '+'
+class StringBuilder:
+    __slots__ = ('parts',)
+
+    def __init__(self):
+        # Initialize an empty builder
+        self.parts = []
+
+    def __str__(self):
+        # Return the string representation of the builder
+        return "<string builder>"
+
+
+def check_string(value):
+    # Check if an argument is a string
+    if not isinstance(value, str):
+        raise RuntimeError("Argument must be a string.")
+
+
+def check_number(value):
+    # Check if an argument is a number
+    if not isinstance(value, (int, float)):
+        raise RuntimeError("Argument must be a number.")
+
+
+def check_finite(value):
+    # Check if an argument is a finite number
+    check_number(value)
+    if not math.isfinite(value):
+        raise RuntimeError("Argument must be a finite number.")
+
+
+def check_index(value):
+    # Check if an argument is an integer index
+    if not isinstance(value, int) and not (isinstance(value, float) and value.is_integer()):
+        raise RuntimeError("Index must be an integer.")
+    return int(value)
+
+
+def check_size(size):
+    # Check if a string or list of size characters or elements is small enough to build
+    if size > MAX_SIZE:
+        raise RuntimeError("Result is too large.")
+
+
+def check_list(value):
+    # Check if an argument is a list
+    if type(value) is not LoxList:
+        raise RuntimeError("Argument must be a list.")
+
+
+def check_builder(value):
+    # Check if an argument is a string builder
+    if not isinstance(value, StringBuilder):
+        raise RuntimeError("Argument must be a string builder.")
+
+
+@STDLIB.native()
+def builder():
+    # Return a new, empty string builder
+    return StringBuilder()
+
+
+@STDLIB.native()
+def append(target, value):
+    # Add a value to the end of a list, or converted as print shows it to the end of a builder, and
+    # return the list or builder
+    if type(target) is LoxList:
+        target.elements.append(value)
+        return target
+    check_builder(target)
+    target.parts.append(value if isinstance(value, str) else stringify(value))
+    return target
+
+
+@STDLIB.native()
+def build(builder):
+    # Return the string collected by a builder
+    check_builder(builder)
+    return "".join(builder.parts)
+
+
+@STDLIB.native()
+def join(source, separator):
+    # Return the elements of a list, converted as print shows them, or the pieces appended to a
+    # builder, joined by a separator
+    check_string(separator)
+    if type(source) is LoxList:
+        return separator.join(value if isinstance(value, str) else stringify(value) for value in source.elements)
+    check_builder(source)
+    return separator.join(source.parts)
+
+
+@STDLIB.native()
+def string(value):
+    # Convert any value to a string, as print shows it
+    return stringify(value)
+
+
+@STDLIB.native()
+def length(value):
+    # Return the number of characters in a string or of elements in a list
+    if type(value) is LoxList:
+        return len(value.elements)
+    check_string(value)
+    return len(value)
+
+
+@STDLIB.native()
+def substring(text, start, end):
+    # Return the characters of a string from index start up to, but not including, index end
+    check_string(text)
+    start = check_index(start)
+    end = check_index(end)
+    if not 0 <= start <= end <= len(text):
+        raise RuntimeError("Substring index out of range.")
+    return text[start:end]
+
+
+@STDLIB.native()
+def indexOf(source, part):
+    # Return the index of the first occurrence of part in a string, or of the first element of a list
+    # equal to part, or -1 if there is none
+    if type(source) is LoxList:
+        for index, value in enumerate(source.elements):
+            if value == part:
+                return index
+        return -1
+    check_string(source)
+    check_string(part)
+    return source.find(part)
+
+
+@STDLIB.native()
+def replace(text, old, new):
+    # Return a string with every occurrence of old replaced by new
+    check_string(text)
+    check_string(old)
+    check_string(new)
+    return text.replace(old, new)
+
+
+@STDLIB.native()
+def repeat(text, count):
+    # Return a string repeated count times
+    check_string(text)
+    count = check_index(count)
+    if count < 0:
+        raise RuntimeError("Repeat count must not be negative.")
+    check_size(len(text) * count)
+    return text * count
+
+
+@STDLIB.native()
+def upper(text):
+    # Return a string in upper case
+    check_string(text)
+    return text.upper()
+
+
+@STDLIB.native()
+def lower(text):
+    # Return a string in lower case
+    check_string(text)
+    return text.lower()
+
+
+@STDLIB.native()
+def trim(text):
+    # Return a string without leading and trailing whitespace
+    check_string(text)
+    return text.strip()
+
+
+@STDLIB.native()
+def number(text):
+    # Parse a string written like a Lox number literal, optionally signed and surrounded by whitespace,
+    # as an integer unless it has a fraction, or return nil
+    check_string(text)
+    match = NUMBER_PATTERN.fullmatch(text.strip())
+    if match is None:
+        return None
+    if match.group(1) is None:
+        try:
+            return int(match.group())
+        except ValueError:
+            # Python refuses to convert integers of thousands of digits
+            raise RuntimeError("Number is too large.")
+    value = float(match.group())
+    return value if math.isfinite(value) else None
+
+
+@STDLIB.native("list")
+def native_list(count, value):
+    # Return a new list of count elements, all set to value
+    count = check_index(count)
+    if count < 0:
+        raise RuntimeError("List size must not be negative.")
+    check_size(count)
+    return LoxList([value] * count)
+
+
+@STDLIB.native("range")
+def native_range(start, end):
+    # Return a new list of the integers from start up to, but not including, end
+    numbers = range(check_index(start), check_index(end))
+    check_size(len(numbers))
+    return LoxList(list(numbers))
+
+
+@STDLIB.native()
+def pop(target):
+    # Remove the last element of a list and return it
+    check_list(target)
+    if not target.elements:
+        raise RuntimeError("Can't pop from an empty list.")
+    return target.elements.pop()
+
+
+@STDLIB.native()
+def insert(target, index, value):
+    # Insert a value into a list before the element at index, or at the end when index is its length
+    check_list(target)
+    index = check_index(index)
+    if not 0 <= index <= len(target.elements):
+        raise RuntimeError("List index out of range.")
+    target.elements.insert(index, value)
+    return target
+
+
+@STDLIB.native()
+def remove(target, index):
+    # Remove the element at index from a list and return it
+    check_list(target)
+    return target.elements.pop(target.position(index))
+
+
+@STDLIB.native("slice")
+def native_slice(target, start, end):
+    # Return a new list of the elements of a list from index start up to, but not including, index end
+    check_list(target)
+    start = check_index(start)
+    end = check_index(end)
+    if not 0 <= start <= end <= len(target.elements):
+        raise RuntimeError("Slice index out of range.")
+    return LoxList(target.elements[start:end])
+
+
+@STDLIB.native()
+def reverse(target):
+    # Reverse the elements of a list in place and return it
+    check_list(target)
+    target.elements.reverse()
+    return target
+
+
+@STDLIB.native("format")
+def native_format(value, digits):
+    # Format a number with a fixed number of digits after the decimal point
+    check_number(value)
+    digits = check_index(digits)
+    if digits < 0:
+        raise RuntimeError("Digits must not be negative.")
+    check_size(digits)
+    return f"{value:.{digits}f}"
+
+
+@STDLIB.native()
+def sqrt(value):
+    # Return the square root of a non-negative number
+    check_number(value)
+    if value < 0:
+        raise RuntimeError("Argument must not be negative.")
+    return math.sqrt(value)
+
+
+@STDLIB.native("pow")
+def native_pow(base, exponent):
+    # Raise a number to a power; integers raised to a non-negative integer power stay integers
+    check_number(base)
+    check_number(exponent)
+    if isinstance(base, int) and isinstance(exponent, int) and exponent >= 0:
+        # The result has at least exponent times as many bits as base, less one
+        if (abs(base).bit_length() - 1) * exponent > MAX_POW_BITS:
+            raise RuntimeError("Result of pow is too large.")
+        return base ** exponent
+    try:
+        return math.pow(base, exponent)
+    except (OverflowError, ValueError):
+        raise RuntimeError("Result of pow is not a real number.")
+
+
+@STDLIB.native()
+def floor(value):
+    # Return the largest integer not greater than a number
+    check_finite(value)
+    return math.floor(value)
+
+
+@STDLIB.native()
+def ceil(value):
+    # Return the smallest integer not less than a number
+    check_finite(value)
+    return math.ceil(value)
+
+
+@STDLIB.native("round")
+def native_round(value):
+    # Return the integer nearest to a number, rounding halves away from zero
+    check_finite(value)
+    # The fraction is computed exactly, where adding 0.5 first would round near halves and large odd
+    # floats to the wrong integer
+    magnitude = abs(value)
+    rounded = math.floor(magnitude)
+    if magnitude - rounded >= 0.5:
+        rounded += 1
+    return rounded if value >= 0 else -rounded
+
+
+@STDLIB.native("abs")
+def native_abs(value):
+    # Return the absolute value of a number
+    check_number(value)
+    return value if value >= 0 else -value
+
+
+@STDLIB.native("min")
+def native_min(left, right):
+    # Return the smaller of two numbers
+    check_number(left)
+    check_number(right)
+    return right if right < left else left
+
+
+@STDLIB.native("max")
+def native_max(left, right):
+    # Return the larger of two numbers
+    check_number(left)
+    check_number(right)
+    return right if right > left else left
+
+
+@STDLIB.native()
+def mod(left, right):
+    # Return the remainder of dividing two numbers, with the sign of the divisor
+    check_number(left)
+    check_number(right)
+    if right == 0:
+        raise RuntimeError("Division by 0 is not allowed.")
+    return left % right
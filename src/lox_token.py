@@ -1,5 +1,10 @@
+from token_type import TOKEN_NAMES
+
+
 # Class representing a token in the Lox language
 class LoxToken:
+    __slots__ = ('type', 'lexeme', 'literal', 'line')
+
     def __init__(self, type, lexeme, literal, line):
         # Initialize the token with its type, lexeme, literal value, and line number
         self.type = type
@@ -7,9 +12,13 @@ class LoxToken:
         self.literal = literal
         self.line = line
 
+    def __reduce__(self):
+        # Pickle as a constructor call, which is more compact than the default slot state
+        return LoxToken, (self.type, self.lexeme, self.literal, self.line)
+
     def __str__(self):
         # Return a string representation of the token
-        return f"{str(self.type)} {self.lexeme} {self.literal}"
+        return f"TokenType.{TOKEN_NAMES[self.type]} {self.lexeme} {self.literal}"
 
     def __repr__(self):
         # Return a representation of the token (same as its string representation)
@@ -0,0 +1,13 @@
+# Conversion of Lox values to text, shared by print, the list representation and the standard library
+
+
+def stringify(value):
+    # Convert a Lox value to text the way print shows it; floats with an integral value drop their '.0'
+    if value is None:
+        return "nil"
+    if isinstance(value, float):
+        text = str(value)
+        if text.endswith(".0"):
+            text = text[:-2]
+        return text
+    return str(value)
@@ -0,0 +1,400 @@
+from lox_chunk import *
+from lox_callable import LoxCallable
+from lox_native import NativeFunction
+from lox_class import LoxClass
+from lox_instance import LoxInstance
+from lox_list import LoxList
+from lox_operators import (add, subtract, multiply, divide, greater, greater_equal, less, less_equal, equal,
+                           not_equal, negate, logical_not)
+from lox_values import stringify
+
+# Deepest nesting of Lox calls one run of the VM allows; frames live in a Python list rather than on
+# the Python stack, so without a limit runaway recursion would grow until memory runs out
+MAX_FRAMES = 10000
+
+
+# A captured variable; it points at a stack slot while open and holds its own value once closed
+class Upvalue:
+    __slots__ = ('location', 'value')
+
+    def __init__(self, location):
+        # Initialize the upvalue with the absolute stack index it refers to
+        self.location = location
+        self.value = None
+
+
+# Runtime representation of a compiled function together with its captured upvalues
+class VmClosure(LoxCallable):
+    __slots__ = ('function', 'upvalues')
+
+    def __init__(self, function, upvalues):
+        # Initialize the closure with its prototype and upvalues
+        self.function = function
+        self.upvalues = upvalues
+
+    def call(self, interpreter, arguments):
+        # Call the closure from Python code; the interpreter passed in is the VM
+        return interpreter.call_value(self, arguments)
+
+    def arity(self):
+        # Return the number of parameters the function expects
+        return self.function.arity
+
+    def bind(self, instance):
+        # Bind the closure to an instance
+        return VmBoundMethod(instance, self)
+
+    def invoke(self, interpreter, instance, arguments):
+        # Call the closure as a method of instance; the interpreter passed in is the VM
+        return interpreter.call_value(VmBoundMethod(instance, self), arguments)
+
+    def __str__(self):
+        # Return the string representation of the function
+        return str(self.function)
+
+
+# A method closure paired with the instance it was accessed on
+class VmBoundMethod(LoxCallable):
+    __slots__ = ('receiver', 'method')
+
+    def __init__(self, receiver, method):
+        # Initialize the bound method with its receiver and method closure
+        self.receiver = receiver
+        self.method = method
+
+    def call(self, interpreter, arguments):
+        # Call the bound method from Python code; the interpreter passed in is the VM
+        return interpreter.call_value(self, arguments)
+
+    def arity(self):
+        # Return the number of parameters the method expects
+        return self.method.function.arity
+
+    def __str__(self):
+        # Return the string representation of the method
+        return str(self.method)
+
+
+# Stack-based virtual machine that executes bytecode produced by the Compiler
+class VM:
+    def __init__(self, interpreter):
+        # Share the interpreter's globals and value printing so both engines see the same state
+        self.interpreter = interpreter
+        self.globals = interpreter.globals
+        self.stack = []
+        self.open_upvalues = {}
+
+    def interpret(self, function):
+        # Run a compiled script function
+        self.stack = []
+        self.open_upvalues = {}
+        closure = VmClosure(function, [])
+        self.stack.append(closure)
+        try:
+            self.run(closure, 0)
+        finally:
+            # After an error, closures that escaped the failed frames must keep the values they
+            # captured rather than stack slots the next program reuses
+            if self.open_upvalues:
+                self.close_upvalues(0)
+            self.interpreter.output.flush()
+
+    def call_value(self, callee, arguments):
+        # Call a closure or bound method from Python code and return its result
+        base = len(self.stack)
+        self.stack.append(callee)
+        self.stack.extend(arguments)
+        if isinstance(callee, VmBoundMethod):
+            self.stack[base] = callee.receiver
+            callee = callee.method
+        self.check_arity(callee.function.arity, len(arguments))
+        return self.run(callee, base)
+
+    def check_arity(self, arity, count):
+        # Raise an error when a call passes the wrong number of arguments
+        if arity != count:
+            raise RuntimeError(f"Expected {arity} arguments but got {count}.")
+
+    def capture_upvalue(self, location):
+        # Return the open upvalue for a stack slot, creating it if needed
+        upvalue = self.open_upvalues.get(location)
+        if upvalue is None:
+            upvalue = Upvalue(location)
+            self.open_upvalues[location] = upvalue
+        return upvalue
+
+    def close_upvalues(self, last):
+        # Close every open upvalue that refers to a stack slot at or above last
+        stack = self.stack
+        for location in [location for location in self.open_upvalues if location >= last]:
+            upvalue = self.open_upvalues.pop(location)
+            upvalue.value = stack[location]
+            upvalue.location = -1
+
+    def run(self, closure, base):
+        # Execute instructions until the frame started at base returns, and return its result
+        stack = self.stack
+        push = stack.append
+        pop = stack.pop
+        global_values = self.globals.values
+        frames = []
+        code = closure.function.chunk.code
+        constants = closure.function.chunk.constants
+        ip = 0
+
+        while True:
+            op = code[ip]
+            ip += 1
+
+            if op == OP_GET_LOCAL:
+                push(stack[base + code[ip]])
+                ip += 1
+            elif op == OP_CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif op == OP_POP:
+                pop()
+            elif op == OP_SET_LOCAL:
+                stack[base + code[ip]] = stack[-1]
+                ip += 1
+            elif op == OP_GET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                try:
+                    push(global_values[name])
+                except KeyError:
+                    raise RuntimeError("Undefined variable " + name + ".")
+            elif op == OP_POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+            elif op == OP_JUMP:
+                ip = code[ip]
+            elif op == OP_LESS:
+                right = pop()
+                stack[-1] = less(stack[-1], right)
+            elif op == OP_ADD:
+                right = pop()
+                stack[-1] = add(stack[-1], right)
+            elif op == OP_SUBTRACT:
+                right = pop()
+                stack[-1] = subtract(stack[-1], right)
+            elif op == OP_GET_UPVALUE:
+                upvalue = closure.upvalues[code[ip]]
+                ip += 1
+                push(stack[upvalue.location] if upvalue.location >= 0 else upvalue.value)
+            elif op == OP_SET_UPVALUE:
+                upvalue = closure.upvalues[code[ip]]
+                ip += 1
+                if upvalue.location >= 0:
+                    stack[upvalue.location] = stack[-1]
+                else:
+                    upvalue.value = stack[-1]
+            elif op == OP_CALL or op == OP_INVOKE:
+                if op == OP_INVOKE:
+                    name = constants[code[ip]]
+                    ip += 1
+                arg_count = code[ip]
+                ip += 1
+                callee_slot = len(stack) - arg_count - 1
+                callee = stack[callee_slot]
+                if op == OP_INVOKE:
+                    # Look the method up on the receiver, which stays in the callee slot as 'this'
+                    if not isinstance(callee, LoxInstance):
+                        raise RuntimeError("Only instances have properties.")
+                    if name in callee.fields:
+                        callee = callee.fields[name]
+                        stack[callee_slot] = callee
+                    else:
+                        method = callee.klass.find_method(name)
+                        if method is None:
+                            raise RuntimeError("Undefined property '" + name + "'.")
+                        callee = method if type(method) is VmClosure else method.bind(callee)
+                if type(callee) is VmBoundMethod:
+                    stack[callee_slot] = callee.receiver
+                    callee = callee.method
+                elif type(callee) is LoxClass:
+                    instance = LoxInstance(callee)
+                    stack[callee_slot] = instance
+                    initializer = callee.find_method("init")
+                    if initializer is None:
+                        self.check_arity(0, arg_count)
+                        continue
+                    if type(initializer) is not VmClosure:
+                        arguments = stack[callee_slot + 1:]
+                        del stack[callee_slot + 1:]
+                        initializer.bind(instance).call(self, arguments)
+                        continue
+                    callee = initializer
+                if type(callee) is VmClosure:
+                    # Calls and method invocations both push their frame here
+                    self.check_arity(callee.function.arity, arg_count)
+                    if len(frames) >= MAX_FRAMES:
+                        raise RuntimeError("Stack overflow.")
+                    frames.append((closure, ip, base))
+                    closure = callee
+                    base = callee_slot
+                    code = closure.function.chunk.code
+                    constants = closure.function.chunk.constants
+                    ip = 0
+                elif type(callee) is NativeFunction:
+                    self.check_arity(callee.param_count, arg_count)
+                    arguments = stack[callee_slot + 1:]
+                    del stack[callee_slot:]
+                    push(callee.function(*arguments))
+                elif isinstance(callee, LoxCallable):
+                    arguments = stack[callee_slot + 1:]
+                    self.check_arity(callee.arity(), arg_count)
+                    del stack[callee_slot:]
+                    push(callee.call(self, arguments))
+                else:
+                    raise RuntimeError("Can only call functions and classes.")
+            elif op == OP_RETURN:
+                result = pop()
+                if self.open_upvalues:
+                    self.close_upvalues(base)
+                del stack[base:]
+                if not frames:
+                    return result
+                push(result)
+                closure, ip, base = frames.pop()
+                code = closure.function.chunk.code
+                constants = closure.function.chunk.constants
+            elif op == OP_NIL:
+                push(None)
+            elif op == OP_TRUE:
+                push(True)
+            elif op == OP_FALSE:
+                push(False)
+            elif op == OP_DEFINE_GLOBAL:
+                global_values[constants[code[ip]]] = pop()
+                ip += 1
+            elif op == OP_SET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name not in global_values:
+                    raise RuntimeError("Undefined variable '" + name + "'.")
+                global_values[name] = stack[-1]
+            elif op == OP_GET_PROPERTY:
+                instance = stack[-1]
+                name = constants[code[ip]]
+                ip += 1
+                if not isinstance(instance, LoxInstance):
+                    raise RuntimeError("Only instances have properties.")
+                if name in instance.fields:
+                    stack[-1] = instance.fields[name]
+                else:
+                    method = instance.klass.find_method(name)
+                    if method is None:
+                        raise RuntimeError("Undefined property '" + name + "'.")
+                    stack[-1] = method.bind(instance)
+            elif op == OP_SET_PROPERTY:
+                value = pop()
+                instance = stack[-1]
+                if not isinstance(instance, LoxInstance):
+                    raise RuntimeError("Only instances have fields")
+                instance.fields[constants[code[ip]]] = value
+                ip += 1
+                stack[-1] = value
+            elif op == OP_GET_INDEX:
+                index = pop()
+                target = stack[-1]
+                if type(target) is not LoxList:
+                    raise RuntimeError("Only lists can be indexed.")
+                stack[-1] = target.get(index)
+            elif op == OP_SET_INDEX:
+                value = pop()
+                index = pop()
+                target = stack[-1]
+                if type(target) is not LoxList:
+                    raise RuntimeError("Only lists can be indexed.")
+                target.set(index, value)
+                stack[-1] = value
+            elif op == OP_BUILD_LIST:
+                count = code[ip]
+                ip += 1
+                if count:
+                    elements = stack[-count:]
+                    del stack[-count:]
+                else:
+                    elements = []
+                push(LoxList(elements))
+            elif op == OP_GET_SUPER:
+                name = constants[code[ip]]
+                ip += 1
+                super_class = pop()
+                method = super_class.find_method(name)
+                if method is None:
+                    raise RuntimeError(f"Undefined property '{name}'.")
+                stack[-1] = method.bind(stack[-1])
+            elif op == OP_EQUAL:
+                right = pop()
+                stack[-1] = equal(stack[-1], right)
+            elif op == OP_NOT_EQUAL:
+                right = pop()
+                stack[-1] = not_equal(stack[-1], right)
+            elif op == OP_GREATER:
+                right = pop()
+                stack[-1] = greater(stack[-1], right)
+            elif op == OP_GREATER_EQUAL:
+                right = pop()
+                stack[-1] = greater_equal(stack[-1], right)
+            elif op == OP_LESS_EQUAL:
+                right = pop()
+                stack[-1] = less_equal(stack[-1], right)
+            elif op == OP_MULTIPLY:
+                right = pop()
+                stack[-1] = multiply(stack[-1], right)
+            elif op == OP_DIVIDE:
+                right = pop()
+                stack[-1] = divide(stack[-1], right)
+            elif op == OP_NOT:
+                stack[-1] = logical_not(stack[-1])
+            elif op == OP_NEGATE:
+                stack[-1] = negate(stack[-1])
+            elif op == OP_PRINT:
+                self.interpreter.output.write_line(stringify(pop()))
+            elif op == OP_JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+            elif op == OP_JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += 1
+                else:
+                    ip = code[ip]
+            elif op == OP_CLOSURE:
+                function = constants[code[ip]]
+                ip += 1
+                upvalues = []
+                for _ in range(function.upvalue_count):
+                    if code[ip]:
+                        upvalues.append(self.capture_upvalue(base + code[ip + 1]))
+                    else:
+                        upvalues.append(closure.upvalues[code[ip + 1]])
+                    ip += 2
+                push(VmClosure(function, upvalues))
+            elif op == OP_CLOSE_UPVALUE:
+                self.close_upvalues(len(stack) - 1)
+                pop()
+            elif op == OP_CLASS:
+                push(LoxClass(constants[code[ip]], None, {}))
+                ip += 1
+            elif op == OP_INHERIT:
+                klass = pop()
+                super_class = stack[-1]
+                if not isinstance(super_class, LoxClass):
+                    raise RuntimeError("Superclass must be a class.")
+                klass.inherit(super_class)
+            elif op == OP_METHOD:
+                method = pop()
+                stack[-1].add_method(constants[code[ip]], method)
+                ip += 1
+            else:
+                raise RuntimeError(f"Unknown opcode {op}.")
+
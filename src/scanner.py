@@ -1,7 +1,31 @@
+import gc
+import re
+import sys
 from lox_token import LoxToken
 from token_type import TokenType
 
+# Reserved words, shared by every scanner instance
+KEYWORDS = {
+    "and": TokenType.AND,
+    "class": TokenType.CLASS,
+    "else": TokenType.ELSE,
+    "false": TokenType.FALSE,
+    "for": TokenType.FOR,
+    "fun": TokenType.FUN,
+    "if": TokenType.IF,
+    "nil": TokenType.NIL,
+    "or": TokenType.OR,
+    "print": TokenType.PRINT,
+    "return": TokenType.RETURN,
+    "super": TokenType.SUPER,
+    "this": TokenType.THIS,
+    "true": TokenType.TRUE,
+    "var": TokenType.VAR,
+    "while": TokenType.WHILE
+}
 
+
+# Character-by-character reference scanner
 class Scanner:
     def __init__(self, source) -> None:
         # Initialize the scanner with source code and setup initial states
@@ -10,24 +34,7 @@ class Scanner:
         self.start = 0
         self.current = 0
         self.line = 1
-        self.keywords = {
-            "and": TokenType.AND,
-            "class": TokenType.CLASS,
-            "else": TokenType.ELSE,
-            "false": TokenType.FALSE,
-            "for": TokenType.FOR,
-            "fun": TokenType.FUN,
-            "if": TokenType.IF,
-            "nil": TokenType.NIL,
-            "or": TokenType.OR,
-            "print": TokenType.PRINT,
-            "return": TokenType.RETURN,
-            "super": TokenType.SUPER,
-            "this": TokenType.THIS,
-            "true": TokenType.TRUE,
-            "var": TokenType.VAR,
-            "while": TokenType.WHILE
-        }
+        self.keywords = KEYWORDS
 
     def scan_tokens(self):
         # Scan tokens until the end of the source code is reached
@@ -52,6 +59,10 @@ class Scanner:
             self.add_token(TokenType.LEFT_BRACE)
         elif c == '}':
             self.add_token(TokenType.RIGHT_BRACE)
+        elif c == '[':
+            self.add_token(TokenType.LEFT_BRACKET)
+        elif c == ']':
+            self.add_token(TokenType.RIGHT_BRACKET)
         elif c == ',':
             self.add_token(TokenType.COMMA)
         elif c == '.':
@@ -152,6 +163,132 @@ class Scanner:
         # Scan an identifier or a keyword
         while self.peek().isalnum() or self.peek() == '_':
             self.advance()
-        text = self.source[self.start:self.current]
+        text = sys.intern(self.source[self.start:self.current])
         token_type = self.keywords.get(text, TokenType.IDENTIFIER)
-        self.add_token(token_type)
+        self.tokens.append(LoxToken(token_type, text, None, self.line))
+
+
+# Operator and punctuation lexemes recognised by the scanners
+OPERATORS = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    "[": TokenType.LEFT_BRACKET,
+    "]": TokenType.RIGHT_BRACKET,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.STAR,
+    "/": TokenType.SLASH,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+}
+
+# Lexemes whose token type follows directly from their text
+FIXED_LEXEMES = {**OPERATORS, **KEYWORDS}
+
+# Master pattern: each match skips leading spaces and comments and captures one lexeme, a run of
+# newlines (with the indentation that follows them), any other single character so that unexpected
+# characters are reported rather than skipped, or the empty end of the source after trailing comments
+TOKEN_PATTERN = re.compile(r"""
+    (?:[ \t\r]+|//[^\n]*)*+
+    (
+        \n[ \t\r\n]*
+      | [^\W\d]\w*
+      | \d+(?:\.\d+)?
+      | "[^"]*"
+      | [!=<>]=?
+      | .
+      | \Z
+    )
+""", re.VERBOSE | re.DOTALL)
+
+
+# Scanner that splits the whole source with a single compiled regular expression and classifies each
+# lexeme with a dictionary lookup. It produces the same tokens and line numbers as Scanner, but does
+# its per-character work inside the regex engine
+class RegexScanner:
+    def __init__(self, source, chunk_size=65536) -> None:
+        # Initialize the scanner with source code, either a string or a text file object that is
+        # read chunk_size characters at a time as tokens are requested
+        self.source = source
+        self.chunk_size = chunk_size
+        self.tokens = []
+        self.line = 1
+
+    def scan_tokens(self):
+        # Scan every token in the source into a list ending with the EOF token. Tokens never form
+        # reference cycles, so the cyclic garbage collector is paused instead of repeatedly walking the list
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self.tokens.extend(self.iter_tokens())
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return self.tokens
+
+    def iter_tokens(self):
+        # Yield tokens one at a time, ending with the EOF token
+        if isinstance(self.source, str):
+            yield from self.tokenize(TOKEN_PATTERN.findall(self.source), True)
+        else:
+            buffer = ""
+            while True:
+                chunk = self.source.read(self.chunk_size)
+                if not chunk:
+                    break
+                buffer += chunk
+                # Lexemes other than strings never span lines, so everything up to the last newline
+                # can be scanned now; a string left open there is rescanned once more input arrives
+                end = buffer.rfind("\n") + 1
+                if end == 0:
+                    continue
+                complete = yield from self.tokenize(TOKEN_PATTERN.findall(buffer, 0, end), False)
+                buffer = buffer[end if complete else buffer.rfind('"', 0, end):]
+            yield from self.tokenize(TOKEN_PATTERN.findall(buffer), True)
+        yield LoxToken(TokenType.EOF, "", None, self.line)
+
+    def tokenize(self, lexemes, final):
+        # Yield the tokens for lexemes split off by the master pattern. Unless this is the final part
+        # of the source, stop at an unterminated string and return False so it can be rescanned.
+        # Names are interned, so every token and environment key for a name shares one string whose
+        # hash is computed once
+        fixed = FIXED_LEXEMES
+        intern = sys.intern
+        line = self.line
+        for text in lexemes:
+            token_type = fixed.get(text)
+            if token_type is not None:
+                yield LoxToken(token_type, intern(text), None, line)
+                continue
+            if not text:
+                break
+            c = text[0]
+            if c == "\n":
+                line += text.count("\n")
+            elif c.isalpha() or c == "_":
+                yield LoxToken(TokenType.IDENTIFIER, intern(text), None, line)
+            elif c.isdigit():
+                yield LoxToken(TokenType.NUMBER, text, float(text) if "." in text else int(text), line)
+            elif c == '"':
+                if len(text) == 1:
+                    if not final:
+                        self.line = line
+                        return False
+                    raise ValueError("Unterminated string.")
+                line += text.count("\n")
+                yield LoxToken(TokenType.STRING, text, text[1:-1], line)
+            else:
+                raise ValueError(f"Unexpected character: {c}")
+        self.line = line
+        return True
@@ -1,53 +1,57 @@
-from enum import Enum
-
-
-# Enum representing different types of tokens in the Lox language
-class TokenType(Enum):
+# Types of tokens in the Lox language. Token types are plain integers rather than Enum members, so
+# the parser and the interpreter compare and hash them at int speed and TokenType.X is an ordinary
+# class attribute lookup; TOKEN_NAMES maps them back to names for display
+class TokenType:
     # Single-character tokens.
-    LEFT_PAREN = '('
-    RIGHT_PAREN = ')'
-    LEFT_BRACE = '{'
-    RIGHT_BRACE = '}'
-    COMMA = ','
-    DOT = '.'
-    MINUS = '-'
-    PLUS = '+'
-    COLON = ':'
-    SEMICOLON = ';'
-    SLASH = '/'
-    STAR = '*'
+    LEFT_PAREN = 0
+    RIGHT_PAREN = 1
+    LEFT_BRACE = 2
+    RIGHT_BRACE = 3
+    LEFT_BRACKET = 4
+    RIGHT_BRACKET = 5
+    COMMA = 6
+    DOT = 7
+    MINUS = 8
+    PLUS = 9
+    COLON = 10
+    SEMICOLON = 11
+    SLASH = 12
+    STAR = 13
 
     # One or two character tokens.
-    BANG = '!'
-    BANG_EQUAL = '!='
-    EQUAL = '='
-    EQUAL_EQUAL = '=='
-    GREATER = '>'
-    GREATER_EQUAL = '>='
-    LESS = '<'
-    LESS_EQUAL = '<='
+    BANG = 14
+    BANG_EQUAL = 15
+    EQUAL = 16
+    EQUAL_EQUAL = 17
+    GREATER = 18
+    GREATER_EQUAL = 19
+    LESS = 20
+    LESS_EQUAL = 21
 
     # Literals.
-    IDENTIFIER = 'identifier'
-    STRING = 'str'
-    NUMBER = 'num'
+    IDENTIFIER = 22
+    STRING = 23
+    NUMBER = 24
 
     # Keywords.
-    AND = 'and'
-    CLASS = 'class'
-    ELSE = 'else'
-    FALSE = 'false'
-    TRUE = 'true'
-    FUN = 'fun'
-    FOR = 'for'
-    IF = 'if'
-    NIL = 'nil'
-    OR = 'or'
-    PRINT = 'print'
-    RETURN = 'return'
-    SUPER = 'super'
-    THIS = 'this'
-    VAR = 'var'
-    WHILE = 'while'
-    INPUT = 'input'
-    EOF = ''
+    AND = 25
+    CLASS = 26
+    ELSE = 27
+    FALSE = 28
+    TRUE = 29
+    FUN = 30
+    FOR = 31
+    IF = 32
+    NIL = 33
+    OR = 34
+    PRINT = 35
+    RETURN = 36
+    SUPER = 37
+    THIS = 38
+    VAR = 39
+    WHILE = 40
+    INPUT = 41
+    EOF = 42
+
+
+TOKEN_NAMES = {value: name for name, value in vars(TokenType).items() if not name.startswith("_")}
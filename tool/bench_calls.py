@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from lox import Lox
+
+PROGRAMS = {
+    "fib": '''
+fun fib(n) {
+  if (n < 2) return n;
+  return fib(n - 1) + fib(n - 2);
+}
+print fib(20);
+''',
+    "deep calls": '''
+fun down(n) {
+  if (n == 0) return 0;
+  return down(n - 1) + 1;
+}
+var total = 0;
+for (var i = 0; i < 300; i = i + 1) {
+  total = total + down(60);
+}
+print total;
+''',
+    "early return": '''
+fun find(limit, target) {
+  for (var i = 0; i < limit; i = i + 1) {
+    if (i == target) {
+      { return i; }
+    }
+  }
+  return -1;
+}
+var total = 0;
+for (var i = 0; i < 2000; i = i + 1) {
+  total = total + find(20, 10);
+}
+print total;
+''',
+}
+
+
+class CallBenchmark:
+    def __init__(self, repeats=5):
+        # Number of timed runs per program and engine; the fastest run is reported
+        self.repeats = repeats
+
+    def time_program(self, source, compile_closures):
+        # Run the program repeatedly in fresh interpreters and return the fastest time
+        best = None
+        for _ in range(self.repeats):
+            lox = Lox()
+            start = time.perf_counter()
+            with redirect_stdout(StringIO()):
+                lox.run(source, compile_closures=compile_closures)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def main(self):
+        # Time each call-heavy program on the tree-walker and on the closure compiler
+        print(f"{'program':<14} {'tree-walker':>12} {'closures':>12}")
+        for name, source in PROGRAMS.items():
+            tree = self.time_program(source, False)
+            closures = self.time_program(source, True)
+            print(f"{name:<14} {tree:11.3f}s {closures:11.3f}s")
+
+
+if __name__ == "__main__":
+    CallBenchmark().main()
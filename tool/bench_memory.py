@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import Expr
+import Stmt
+from scanner import RegexScanner
+from lox_parser import Parser
+
+TEMPLATE = '''
+class Shape{n} {{
+  init(w, h) {{ this.w = w; this.h = h; }}
+  area() {{ return this.w * this.h; }}
+}}
+fun compute{n}(limit) {{
+  var total = 0;
+  for (var i = 0; i < limit; i = i + 1) {{
+    if (i / 2 > 3 and !(i == 7)) total = total + Shape{n}(i, 2.5).area();
+    else total = total - 1;
+  }}
+  return total;
+}}
+print "result " + compute{n}({n});
+'''
+
+
+class MemoryBenchmark:
+    def __init__(self, copies=2000):
+        # Build a large generated program from numbered copies of the template
+        self.source = "".join(TEMPLATE.format(n=n) for n in range(copies))
+
+    def count_nodes(self, statements):
+        # Count every Expr and Stmt node reachable from the parsed statements
+        count = 0
+        pending = list(statements)
+        while pending:
+            node = pending.pop()
+            if isinstance(node, list):
+                pending.extend(node)
+                continue
+            if not isinstance(node, (Expr.Expr, Stmt.Stmt)):
+                continue
+            count += 1
+            if hasattr(node, "__dict__"):
+                pending.extend(vars(node).values())
+            else:
+                pending.extend(getattr(node, field) for field in type(node).__slots__)
+        return count
+
+    def time_phases(self, repeats=3):
+        # Return the best scan and parse times over a few untraced runs
+        scan_time = parse_time = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            tokens = RegexScanner(self.source).scan_tokens()
+            scanned = time.perf_counter()
+            Parser(tokens).parse()
+            parsed = time.perf_counter()
+            scan_time = min(scan_time or scanned - start, scanned - start)
+            parse_time = min(parse_time or parsed - scanned, parsed - scanned)
+        return scan_time, parse_time
+
+    def main(self):
+        # Measure the scan and parse times and the memory held by the token list and by the parsed tree
+        scan_time, parse_time = self.time_phases()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tokens = RegexScanner(self.source).scan_tokens()
+        after_scan = tracemalloc.get_traced_memory()[0]
+        statements = Parser(tokens).parse()
+        after_parse = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        nodes = self.count_nodes(statements)
+        print(f"source:      {len(self.source)} bytes")
+        print(f"tokens:      {len(tokens)}, {(after_scan - baseline) / len(tokens):.1f} bytes per token")
+        print(f"nodes:       {nodes}, {(after_parse - after_scan) / nodes:.1f} bytes per node")
+        print(f"total:       {(after_parse - baseline) / 1024 / 1024:.2f} MiB")
+        print(f"scan time:   {scan_time:.3f}s")
+        print(f"parse time:  {parse_time:.3f}s")
+
+
+if __name__ == "__main__":
+    MemoryBenchmark().main()
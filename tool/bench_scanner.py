@@ -0,0 +1,36 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from scanner import Scanner, RegexScanner
+from bench_memory import TEMPLATE
+
+
+class ScannerBenchmark:
+    def __init__(self, copies=6000):
+        # Build a multi-megabyte generated program from numbered copies of the template
+        self.source = "".join(TEMPLATE.format(n=n) for n in range(copies))
+
+    def time_scanner(self, scanner_class):
+        # Tokenize the source once and return the tokens and the elapsed time
+        start = time.perf_counter()
+        tokens = scanner_class(self.source).scan_tokens()
+        return tokens, time.perf_counter() - start
+
+    def main(self):
+        # Compare the throughput of both scanners and check that they agree on every token
+        megabytes = len(self.source) / 1024 / 1024
+        print(f"source: {megabytes:.2f} MiB")
+        results = {}
+        for scanner_class in (Scanner, RegexScanner):
+            tokens, elapsed = self.time_scanner(scanner_class)
+            results[scanner_class.__name__] = [(t.type, t.lexeme, t.literal, t.line) for t in tokens]
+            print(f"{scanner_class.__name__:<13} {elapsed:7.3f}s  {megabytes / elapsed:6.2f} MiB/s  "
+                  f"{len(tokens) / elapsed:10.0f} tokens/s")
+        print("identical tokens:", results["Scanner"] == results["RegexScanner"])
+
+
+if __name__ == "__main__":
+    ScannerBenchmark().main()
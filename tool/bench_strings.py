@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from lox import Lox
+
+# Both programs build the same string of count numbered pieces
+CONCATENATE = '''
+var text = "";
+for (var i = 0; i < COUNT; i = i + 1) {
+  text = text + "item " + i + ";";
+}
+print length(text);
+'''
+
+BUILDER = '''
+var parts = builder();
+for (var i = 0; i < COUNT; i = i + 1) {
+  append(append(append(parts, "item "), i), ";");
+}
+print length(build(parts));
+'''
+
+COUNTS = (1000, 10000, 50000)
+
+ENGINES = {
+    "tree-walker": {},
+    "closures": {"compile_closures": True},
+    "vm": {"use_vm": True},
+}
+
+
+class StringBenchmark:
+    def __init__(self, repeats=3):
+        # Number of timed runs per program and engine; the fastest run is reported
+        self.repeats = repeats
+
+    def time_program(self, source, options):
+        # Run the program repeatedly in fresh interpreters and return the fastest time
+        best = None
+        for _ in range(self.repeats):
+            lox = Lox()
+            start = time.perf_counter()
+            with redirect_stdout(StringIO()):
+                lox.run(source, **options)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def main(self):
+        # Time building strings of growing size with '+' and with a string builder on every engine
+        print(f"{'engine':<12} {'pieces':>8} {'+ loop':>10} {'builder':>10}")
+        for engine, options in ENGINES.items():
+            for count in COUNTS:
+                concatenate = self.time_program(CONCATENATE.replace("COUNT", str(count)), options)
+                builder = self.time_program(BUILDER.replace("COUNT", str(count)), options)
+                print(f"{engine:<12} {count:>8} {concatenate:9.3f}s {builder:9.3f}s")
+
+
+if __name__ == "__main__":
+    StringBenchmark().main()
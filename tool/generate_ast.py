@@ -10,6 +10,9 @@ class GenerateAst:
             "Call": ('callee', 'paren', 'arguments'),
             "Get": ('object', 'name'),
             "Grouping": ('expr'),
+            "Index": ('object', 'bracket', 'index'),
+            "IndexSet": ('object', 'bracket', 'index', 'value'),
+            "List": ('bracket', 'elements'),
             "Literal": ('value'),
             "Logical": ('left', 'operator', 'right'),
             "Set": ('object', 'name', 'value'),
@@ -27,7 +30,18 @@ class GenerateAst:
             "Print": ('expr'),
             "Return": ('keyword', 'value'),
             "Var": ('name', 'initializer'),
-            "While": ('condition', 'body')
+            "While": ('condition', 'body'),
+            "Input": ('name', 'expression')
+        }
+        # Fields filled in after parsing rather than passed to the constructor, with the source of
+        # their initial value: the resolver's scope distance and slot (depth stays None for globals)
+        # and the interpreter's inline method cache for property accesses, an empty (class, method) pair
+        self.annotations = {
+            "Assign": {'depth': 'None', 'slot': 'None'},
+            "Get": {'cached': '(None, None)'},
+            "Super": {'depth': 'None', 'slot': 'None'},
+            "This": {'depth': 'None', 'slot': 'None'},
+            "Variable": {'depth': 'None', 'slot': 'None'}
         }
 
     def main(self):
@@ -42,6 +56,8 @@ class GenerateAst:
         file.write('from abc import ABC, abstractmethod\n')
         self.define_visitor(file, baseName, types)
         file.write(f'class {baseName}:\n')
+        file.write(f'{TAB}__slots__ = ()\n')
+        file.write('\n')
         file.write(f'{TAB}')
         file.write(f'@abstractmethod\n')
         file.write(f'{TAB}def __init__(self):\n')
@@ -53,8 +69,14 @@ class GenerateAst:
         file.write('\n')
 
     def define_type(self, file, baseName, className, fields):
-        # Define a subclass for each type of expression or statement
+        # Define a subclass for each type of expression or statement; attributes live in __slots__
+        # so nodes carry no per-instance __dict__
         file.write(f'class {className}({baseName}):\n')
+        attributes = (fields,) if type(fields) is not tuple else tuple(field.split(":")[0] for field in fields)
+        annotations = self.annotations.get(className, {})
+        attributes += tuple(annotations)
+        file.write(f'{TAB}__slots__ = {attributes!r}\n')
+        file.write('\n')
         file.write(f'{TAB}')
         if type(fields) is not tuple:
             file.write(f'def __init__(self, {fields}):\n')
@@ -66,6 +88,8 @@ class GenerateAst:
             for field in fields:
                 att = field.split(":")[0]
                 file.write(f'{TAB * 2}self.{att} = {att}\n')
+        for annotation, default in annotations.items():
+            file.write(f'{TAB * 2}self.{annotation} = {default}\n')
         file.write('\n')
         file.write(f'{TAB}def accept(self, visitor):\n')
         file.write(f'{TAB * 2}return visitor.visit_{className.lower()}_{baseName.lower()}(self)\n')
@@ -77,7 +101,7 @@ class GenerateAst:
         file.write(f'class {visitor}(ABC):\n')
         for type in types:
             file.write(f'{TAB}@abstractmethod\n')
-            file.write(f'{TAB}def visit_{type.lower()}_{baseName.lower()}(self, expr):\n')
+            file.write(f'{TAB}def visit_{type.lower()}_{baseName.lower()}(self, {baseName.lower()}):\n')
             file.write(f'{TAB * 2}pass \n')
         file.write(f'\n')
 